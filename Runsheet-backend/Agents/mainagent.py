@@ -1,7 +1,13 @@
 import os
+import asyncio
 import logging
+import random
+import re
+import threading
+from pathlib import Path
 from typing import AsyncGenerator
 from strands import Agent
+from strands.agent.conversation_manager import SlidingWindowConversationManager
 from strands.models.litellm import LiteLLMModel
 from dotenv import load_dotenv
 from .tools import ALL_TOOLS
@@ -9,107 +15,181 @@ from .tools import ALL_TOOLS
 # Load environment variables
 load_dotenv()
 
+# Use uvloop for the agent's streaming I/O when available (not supported on Windows)
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
+
 # Disable OpenTelemetry to avoid context errors
 os.environ['OTEL_SDK_DISABLED'] = 'true'
 os.environ['OTEL_PYTHON_DISABLED'] = 'true'
 os.environ['OTEL_EXPORTER_OTLP_ENDPOINT'] = ''
 
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Suppress OpenTelemetry warnings and errors
 logging.getLogger('opentelemetry').setLevel(logging.CRITICAL)
 logging.getLogger('opentelemetry.context').setLevel(logging.CRITICAL)
 
+# Event loop policy: coroutines bind asyncio.get_running_loop() once at entry and pass it down;
+# never call asyncio.get_event_loop() inside async code (deprecated, slow fallback on 3.10+)
+
+# Streamed text deltas are coalesced into one event per flush window (seconds)
+# or once this many deltas are buffered, whichever comes first
+STREAM_FLUSH_INTERVAL = 0.02
+STREAM_FLUSH_MAX_CHUNKS = 16
+
+# Number of recent messages kept in the agent's context
+AGENT_WINDOW_SIZE = int(os.environ.get("AGENT_WINDOW_SIZE", "20"))
+
+# Upper bound on tokens generated per model call
+AGENT_MAX_TOKENS = int(os.environ.get("AGENT_MAX_TOKENS", "2048"))
+
+# Stream event keys the chat endpoint consumes; other Strands events (raw model chunks,
+# lifecycle/trace events) are dropped before reaching the client
+_CLIENT_EVENT_KEYS = frozenset({"data", "current_tool_use", "current_tool_result", "result", "error", "type"})
+
+# Errors matching this pattern are treated as transient and retried
+_CONN_ERR_RE = re.compile(r"connection closed|connection error|timeout|unavailable", re.I)
+
+# System prompt for the logistics assistant
+SYSTEM_PROMPT = """You are a Logistics AI Assistant for a fleet management and logistics platform. You help users manage their transportation operations, track deliveries, and optimize logistics workflows.
+
+**YOU NOW HAVE ACCESS TO LIVE DATA!** You can search and analyze real fleet, order, and support data using your tools.
+
+**CHAT MODE:**
+When in Chat Mode, you:
+- Answer questions about logistics using real data from your tools
+- ALWAYS announce your actions: "Let me search for [topic]..." BEFORE using tools
+- Use semantic search to find relevant information
+- Provide insights based on actual data
+- Be conversational and helpful
+- Explain what you found and provide actionable insights
+
+**AGENT MODE:**
+When in Agent Mode, you:
+- Generate comprehensive reports using multiple tools
+- Provide structured analysis with markdown formatting
+- Use report generation tools for complex analysis
+- Be systematic and thorough in data gathering
+- Present findings in a professional report format
+- Always explain your methodology and data sources
+
+**Available Tools:**
+- `search_fleet_data(query)` - Search trucks using semantic search
+- `search_orders(query)` - Search orders using semantic search  
+- `search_support_tickets(query)` - Search support tickets using semantic search
+- `search_inventory(query)` - Search inventory items using semantic search
+- `multi_search(queries)` - Search trucks, orders, support tickets and inventory in one call, e.g. {"trucks": "...", "support_tickets": "..."}
+- `get_inventory_summary()` - Get all inventory items organized by status
+- `get_fleet_summary()` - Get current fleet status overview
+- `get_analytics_overview()` - Get performance metrics and KPIs
+- `get_performance_insights()` - Get actionable performance insights
+- `find_truck_by_id(truck_id)` - Find specific truck by ID/plate number
+- `find_trucks_by_ids(truck_ids)` - Find several trucks by ID/plate number in one call
+- `get_all_locations()` - Get all depots, warehouses, and stations
+- `generate_operations_report()` - Generate comprehensive operations status report
+- `generate_performance_report()` - Generate detailed performance analysis report
+- `generate_incident_analysis(issue)` - Analyze incidents across multiple data sources
+
+When a question spans several data sources (e.g. fleet, orders and support tickets), prefer a single `multi_search` call over separate search calls.
+
+**Your Expertise Areas:**
+- Fleet tracking and vehicle management
+- Route optimization and planning
+- Delivery scheduling and coordination
+- Customer order processing
+- Support ticket analysis
+- Logistics performance analytics
+- Supply chain optimization
+
+**Your Personality:**
+- Professional logistics expert with access to live data
+- Always explain what you're searching for before using tools
+- Provide actionable insights based on real information
+- Clear communicator who builds trust through transparency
+
+**Example Interactions:**
+User: "Show me delayed trucks"
+You: "Let me search for delayed vehicles in our fleet..." [calls get_fleet_summary]
+You: "I found [X] delayed trucks. Here's the breakdown: [results and analysis]"
+
+User: "Find orders with network equipment"  
+You: "Let me search our orders for network equipment..." [calls search_orders]
+You: "I found [X] orders containing network equipment: [results and insights]"
+
+Always announce your tool usage and explain the results clearly."""
+
+# Service account key shipped alongside the backend for local development
+CREDENTIALS_FILE = Path(__file__).resolve().parents[1] / "ascendant-woods-462020-n0-78d818c9658e.json"
+
+# Set once credentials have been configured for this process
+_CREDS_READY = False
+
+# Gemini model and Strands agent are built once per process and shared by every LogisticsAgent
+_shared_agent = None
+_shared_agent_lock = threading.Lock()
+
+def _get_shared_agent() -> Agent:
+    """Return the process-wide Strands agent, building it on first use"""
+    global _shared_agent
+    if _shared_agent is None:
+        with _shared_agent_lock:
+            if _shared_agent is None:
+                # Initialize Gemini model through LiteLLM
+                gemini_model = LiteLLMModel(
+                    model_id="vertex_ai/gemini-2.5-flash",
+                    client_args={
+                        "vertex_project": os.environ.get('GOOGLE_CLOUD_PROJECT', 'ascendant-woods-462020-n0'),
+                        "vertex_location": "us-central1",
+                    },
+                    params={
+                        "max_tokens": AGENT_MAX_TOKENS,
+                        "temperature": 0.7,
+                    }
+                )
+                
+                # Initialize Strands Agent with the Gemini model
+                _shared_agent = Agent(
+                    model=gemini_model,
+                    system_prompt=SYSTEM_PROMPT,
+                    tools=ALL_TOOLS,
+                    conversation_manager=SlidingWindowConversationManager(window_size=AGENT_WINDOW_SIZE)
+                )
+                logger.info("✅ Logistics Agent initialized with Strands + Gemini 2.5 Flash")
+    return _shared_agent
+
 class LogisticsAgent:
+    __slots__ = ("agent",)
+
     def __init__(self):
-        # Setup Google credentials
-        self.setup_gemini_credentials()
+        self.agent = None
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop yet - finish setup synchronously
+            asyncio.run(self.ainit())
+        # Inside a running loop, setup completes on the first ainit() (startup or first chat)
+
+    async def ainit(self):
+        """Setup credentials and bind the shared agent without blocking the event loop"""
+        if self.agent is not None:
+            return
         
-        # Initialize Gemini model through LiteLLM
-        gemini_model = LiteLLMModel(
-            model_id="vertex_ai/gemini-2.5-flash",
-            client_args={
-                "vertex_project": os.environ.get('GOOGLE_CLOUD_PROJECT', 'ascendant-woods-462020-n0'),
-                "vertex_location": "us-central1",
-            },
-            params={
-                "max_tokens": 8000,
-                "temperature": 0.7,
-            }
-        )
+        # Setup Google credentials
+        await asyncio.to_thread(self.setup_gemini_credentials)
         
-        # Initialize Strands Agent with the Gemini model
-        self.agent = Agent(
-            model=gemini_model,
-            system_prompt="""You are a Logistics AI Assistant for a fleet management and logistics platform. You help users manage their transportation operations, track deliveries, and optimize logistics workflows.
-
-            **YOU NOW HAVE ACCESS TO LIVE DATA!** You can search and analyze real fleet, order, and support data using your tools.
-
-            **CHAT MODE:**
-            When in Chat Mode, you:
-            - Answer questions about logistics using real data from your tools
-            - ALWAYS announce your actions: "Let me search for [topic]..." BEFORE using tools
-            - Use semantic search to find relevant information
-            - Provide insights based on actual data
-            - Be conversational and helpful
-            - Explain what you found and provide actionable insights
-
-            **AGENT MODE:**
-            When in Agent Mode, you:
-            - Generate comprehensive reports using multiple tools
-            - Provide structured analysis with markdown formatting
-            - Use report generation tools for complex analysis
-            - Be systematic and thorough in data gathering
-            - Present findings in a professional report format
-            - Always explain your methodology and data sources
-
-            **Available Tools:**
-            - `search_fleet_data(query)` - Search trucks using semantic search
-            - `search_orders(query)` - Search orders using semantic search  
-            - `search_support_tickets(query)` - Search support tickets using semantic search
-            - `search_inventory(query)` - Search inventory items using semantic search
-            - `get_inventory_summary()` - Get all inventory items organized by status
-            - `get_fleet_summary()` - Get current fleet status overview
-            - `get_analytics_overview()` - Get performance metrics and KPIs
-            - `get_performance_insights()` - Get actionable performance insights
-            - `find_truck_by_id(truck_id)` - Find specific truck by ID/plate number
-            - `get_all_locations()` - Get all depots, warehouses, and stations
-            - `generate_operations_report()` - Generate comprehensive operations status report
-            - `generate_performance_report()` - Generate detailed performance analysis report
-            - `generate_incident_analysis(issue)` - Analyze incidents across multiple data sources
-
-            **Your Expertise Areas:**
-            - Fleet tracking and vehicle management
-            - Route optimization and planning
-            - Delivery scheduling and coordination
-            - Customer order processing
-            - Support ticket analysis
-            - Logistics performance analytics
-            - Supply chain optimization
-
-            **Your Personality:**
-            - Professional logistics expert with access to live data
-            - Always explain what you're searching for before using tools
-            - Provide actionable insights based on real information
-            - Clear communicator who builds trust through transparency
-
-            **Example Interactions:**
-            User: "Show me delayed trucks"
-            You: "Let me search for delayed vehicles in our fleet..." [calls get_fleet_summary]
-            You: "I found [X] delayed trucks. Here's the breakdown: [results and analysis]"
-
-            User: "Find orders with network equipment"  
-            You: "Let me search our orders for network equipment..." [calls search_orders]
-            You: "I found [X] orders containing network equipment: [results and insights]"
-
-            Always announce your tool usage and explain the results clearly.""",
-            tools=ALL_TOOLS
-        )
-        logger.info("✅ Logistics Agent initialized with Strands + Gemini 2.5 Flash")
+        # Bind the shared Strands agent
+        self.agent = await asyncio.to_thread(_get_shared_agent)
 
     def setup_gemini_credentials(self):
-        """Setup Gemini credentials using the service account file"""
+        """Setup Gemini credentials using the service account file (once per process)"""
+        global _CREDS_READY
+        if _CREDS_READY:
+            return
+        
         try:
             # Check if running in Cloud Run (has GOOGLE_APPLICATION_CREDENTIALS set)
             if os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'):
@@ -122,7 +202,7 @@ class LogisticsAgent:
                 os.environ.get('GOOGLE_APPLICATION_CREDENTIALS'),  # From env var
                 "ascendant-woods-462020-n0-78d818c9658e.json",    # Relative path
                 "./ascendant-woods-462020-n0-78d818c9658e.json",  # Current dir
-                "C:/Users/Victo/Desktop/Runsheet/Runsheet-backend/ascendant-woods-462020-n0-78d818c9658e.json"  # Absolute path
+                str(CREDENTIALS_FILE)  # Backend directory
             ]
             
             credentials_path = None
@@ -143,30 +223,43 @@ class LogisticsAgent:
             logger.error(f"Failed to setup Gemini credentials: {e}")
             # Don't raise - let it try with default credentials
             os.environ['GOOGLE_CLOUD_PROJECT'] = 'ascendant-woods-462020-n0'
+        finally:
+            _CREDS_READY = True
 
     def clear_memory(self):
         """Clear the agent's conversation memory"""
         try:
             # Clear Strands agent's message history
-            self.agent.messages = []
+            if self.agent is not None:
+                self.agent.messages = []
             logger.info("✅ Agent memory cleared")
         except Exception as e:
             logger.error(f"Failed to clear agent memory: {e}")
 
     async def chat_streaming(self, message: str, mode: str = "chat") -> AsyncGenerator[dict, None]:
         """Asynchronous streaming chat method with retry logic"""
+        # Skip the model round trip entirely for empty prompts
+        message = message.strip() if message else ""
+        if not message:
+            yield {"error": "empty prompt"}
+            return
+        
+        loop = asyncio.get_running_loop()
+        await self.ainit()
         max_retries = 3
         retry_count = 0
         
+        # Add mode context to the message
+        mode_upper = mode.upper()
+        message_with_context = f"[Mode: {mode_upper}] {message}"
+        
         while retry_count < max_retries:
             try:
-                # Add mode context to the message
-                message_with_context = f"[Mode: {mode.upper()}] {message}"
-                
                 # Track if we got any response
                 got_response = False
                 
-                async for event in self.agent.stream_async(message_with_context):
+                events = self._batch_text_events(self.agent.stream_async(message_with_context), loop)
+                async for event in events:
                     got_response = True
                     yield event
                 
@@ -178,9 +271,7 @@ class LogisticsAgent:
                 error_msg = str(e)
                 
                 # Check if it's a connection error
-                is_connection_error = any(keyword in error_msg.lower() for keyword in [
-                    'connection closed', 'connection error', 'timeout', 'unavailable'
-                ])
+                is_connection_error = bool(_CONN_ERR_RE.search(error_msg))
                 
                 if is_connection_error and retry_count < max_retries:
                     logger.warning(f"Connection error (attempt {retry_count}/{max_retries}): {error_msg}")
@@ -189,9 +280,8 @@ class LogisticsAgent:
                         "content": f"🔄 Connection interrupted, retrying... (attempt {retry_count}/{max_retries})"
                     }
                     
-                    # Wait a bit before retrying
-                    import asyncio
-                    await asyncio.sleep(1 * retry_count)  # Exponential backoff
+                    # Capped exponential backoff with jitter
+                    await asyncio.sleep(min(0.25 * (2 ** (retry_count - 1)), 2.0) + random.random() * 0.1)
                     continue
                 else:
                     # Non-connection error or max retries reached
@@ -209,15 +299,82 @@ class LogisticsAgent:
                         }
                     return
 
+    async def _batch_text_events(self, events, loop: asyncio.AbstractEventLoop) -> AsyncGenerator[dict, None]:
+        """Coalesce consecutive text deltas into batched "data" events; other events flush immediately"""
+        buffer = []
+        last_flush = loop.time()
+        next_event = asyncio.ensure_future(events.__anext__())
+        try:
+            while True:
+                timeout = None
+                if buffer:
+                    timeout = max(0.0, STREAM_FLUSH_INTERVAL - (loop.time() - last_flush))
+                done, _ = await asyncio.wait({next_event}, timeout=timeout)
+                
+                if not done:
+                    # Flush window elapsed while waiting on the model
+                    yield {"data": "".join(buffer)}
+                    buffer = []
+                    last_flush = loop.time()
+                    continue
+                
+                try:
+                    event = next_event.result()
+                except StopAsyncIteration:
+                    break
+                next_event = asyncio.ensure_future(events.__anext__())
+                
+                text = event.get("data") if isinstance(event, dict) else None
+                if text:
+                    buffer.append(text)
+                    if len(buffer) >= STREAM_FLUSH_MAX_CHUNKS or loop.time() - last_flush >= STREAM_FLUSH_INTERVAL:
+                        yield {"data": "".join(buffer)}
+                        buffer = []
+                        last_flush = loop.time()
+                    continue
+                
+                if not isinstance(event, dict) or _CLIENT_EVENT_KEYS.isdisjoint(event):
+                    logger.debug("Dropping internal stream event: %s", event if not isinstance(event, dict) else list(event))
+                    continue
+                
+                if buffer:
+                    yield {"data": "".join(buffer)}
+                    buffer = []
+                    last_flush = loop.time()
+                yield event
+            
+            if buffer:
+                yield {"data": "".join(buffer)}
+        finally:
+            if next_event.done() and not next_event.cancelled():
+                # Retrieve the prefetch's outcome so a StopAsyncIteration or source error isn't left unread
+                error = next_event.exception()
+                if error is not None and not isinstance(error, StopAsyncIteration):
+                    logger.debug(f"Discarding stream event after consumer stopped: {error}")
+            else:
+                next_event.cancel()
+                await asyncio.gather(next_event, return_exceptions=True)
+            
+            # Shut the source stream down rather than leaving it half-consumed
+            try:
+                await events.aclose()
+            except Exception as e:
+                logger.debug(f"Error closing agent stream: {e}")
+
     async def chat_fallback(self, message: str, mode: str = "chat") -> str:
-        """Non-streaming fallback method for when streaming fails"""
+        """Non-streaming fallback method for when streaming fails; returns the full response text"""
         try:
             logger.info("🔄 Using non-streaming fallback mode")
+            await self.ainit()
             message_with_context = f"[Mode: {mode.upper()}] {message}"
             
-            # Use non-streaming completion
-            response = await self.agent.run_async(message_with_context)
-            return response
+            # Drive the same streaming path and aggregate the text locally
+            parts = []
+            async for event in self.agent.stream_async(message_with_context):
+                text = event.get("data") if isinstance(event, dict) else None
+                if text:
+                    parts.append(text)
+            return "".join(parts)
             
         except Exception as e:
             logger.error(f"Error in fallback chat: {e}")
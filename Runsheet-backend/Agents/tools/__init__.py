@@ -6,7 +6,8 @@ from .search_tools import (
     search_fleet_data,
     search_orders,
     search_support_tickets,
-    search_inventory
+    search_inventory,
+    multi_search
 )
 
 from .summary_tools import (
@@ -18,6 +19,7 @@ from .summary_tools import (
 
 from .lookup_tools import (
     find_truck_by_id,
+    find_trucks_by_ids,
     get_all_locations
 )
 
@@ -34,6 +36,7 @@ ALL_TOOLS = [
     search_orders,
     search_support_tickets,
     search_inventory,
+    multi_search,
     
     # Summary tools
     get_fleet_summary,
@@ -43,6 +46,7 @@ ALL_TOOLS = [
     
     # Lookup tools
     find_truck_by_id,
+    find_trucks_by_ids,
     get_all_locations,
     
     # Report tools
@@ -3,11 +3,38 @@ Lookup and specific data retrieval tools
 """
 
 import logging
+from collections import defaultdict
 from strands import tool
 from services.elasticsearch_service import elasticsearch_service
 
 logger = logging.getLogger(__name__)
 
+# Emoji lookups, defaulting to 🟡 for other truck statuses and 📍 for other location types
+TRUCK_STATUS_EMOJI = {"on_time": "🟢", "delayed": "🔴"}
+LOCATION_TYPE_EMOJI = {"depot": "🏭", "warehouse": "🏢", "station": "🚉", "port": "⚓"}
+
+def _format_truck_details(truck: dict) -> str:
+    status_emoji = TRUCK_STATUS_EMOJI.get(truck.get('status'), "🟡")
+    
+    parts = [
+        f"🚛 **Truck {truck.get('plate_number')}** {status_emoji}\n\n",
+        f"• **Driver**: {truck.get('driver_name')}\n",
+        f"• **Status**: {truck.get('status')}\n",
+        f"• **Location**: {truck.get('current_location', {}).get('name', 'Unknown')}\n",
+        f"• **Destination**: {truck.get('destination', {}).get('name', 'Unknown')}\n",
+        f"• **ETA**: {truck.get('estimated_arrival', 'Unknown')}\n"
+    ]
+    
+    if truck.get('cargo'):
+        cargo = truck.get('cargo')
+        parts.append("\n**Cargo:**\n")
+        parts.append(f"• Type: {cargo.get('type')}\n")
+        parts.append(f"• Weight: {cargo.get('weight')} kg\n")
+        parts.append(f"• Priority: {cargo.get('priority')}\n")
+        parts.append(f"• Description: {cargo.get('description')}\n")
+    
+    return "".join(parts)
+
 @tool
 async def find_truck_by_id(truck_identifier: str) -> str:
     """
@@ -21,40 +48,53 @@ async def find_truck_by_id(truck_identifier: str) -> str:
     """
     try:
         logger.info(f"🚛 Finding truck: {truck_identifier}")
-        trucks = await elasticsearch_service.get_all_documents("trucks")
         
         # Find truck by ID or plate number
-        truck = None
-        for t in trucks:
-            if (t.get('truck_id', '').lower() == truck_identifier.lower() or 
-                t.get('plate_number', '').lower() == truck_identifier.lower()):
-                truck = t
-                break
+        truck = await elasticsearch_service.find_one(
+            "trucks", {"truck_id": truck_identifier, "plate_number": truck_identifier}
+        )
         
         if not truck:
             return f"Truck not found: {truck_identifier}"
         
-        status_emoji = "🟢" if truck.get('status') == 'on_time' else "🔴" if truck.get('status') == 'delayed' else "🟡"
+        return _format_truck_details(truck)
+    except Exception as e:
+        logger.error(f"Error finding truck: {e}")
+        return f"Error finding truck: {str(e)}"
+
+@tool
+async def find_trucks_by_ids(truck_identifiers: list[str]) -> str:
+    """
+    Find several trucks at once by ID or plate number.
+    
+    Args:
+        truck_identifiers: Truck IDs or plate numbers (e.g., ["GI-58A", "MO-84A"])
+    
+    Returns:
+        Detailed information for each truck found, and the identifiers that were not found
+    """
+    try:
+        logger.info(f"🚛 Finding trucks: {', '.join(truck_identifiers)}")
+        
+        if not truck_identifiers:
+            return "No truck identifiers provided"
+        
+        trucks = await elasticsearch_service.find_trucks_by_ids(truck_identifiers)
         
-        response = f"🚛 **Truck {truck.get('plate_number')}** {status_emoji}\n\n"
-        response += f"• **Driver**: {truck.get('driver_name')}\n"
-        response += f"• **Status**: {truck.get('status')}\n"
-        response += f"• **Location**: {truck.get('current_location', {}).get('name', 'Unknown')}\n"
-        response += f"• **Destination**: {truck.get('destination', {}).get('name', 'Unknown')}\n"
-        response += f"• **ETA**: {truck.get('estimated_arrival', 'Unknown')}\n"
+        found = set()
+        for truck in trucks:
+            found.add(truck.get('truck_id', '').casefold())
+            found.add(truck.get('plate_number', '').casefold())
+        missing = [i for i in truck_identifiers if i.casefold() not in found]
         
-        if truck.get('cargo'):
-            cargo = truck.get('cargo')
-            response += f"\n**Cargo:**\n"
-            response += f"• Type: {cargo.get('type')}\n"
-            response += f"• Weight: {cargo.get('weight')} kg\n"
-            response += f"• Priority: {cargo.get('priority')}\n"
-            response += f"• Description: {cargo.get('description')}\n"
+        parts = [_format_truck_details(truck) + "\n" for truck in trucks]
+        if missing:
+            parts.append(f"Trucks not found: {', '.join(missing)}\n")
         
-        return response
+        return "".join(parts)
     except Exception as e:
-        logger.error(f"Error finding truck: {e}")
-        return f"Error finding truck: {str(e)}"
+        logger.error(f"Error finding trucks: {e}")
+        return f"Error finding trucks: {str(e)}"
 
 @tool
 async def get_all_locations() -> str:
@@ -66,26 +106,24 @@ async def get_all_locations() -> str:
     """
     try:
         logger.info("📍 Getting all locations")
-        locations = await elasticsearch_service.get_all_documents("locations")
+        locations = await elasticsearch_service.get_all_documents(
+            "locations", source_includes=["name", "region", "type"]
+        )
         
-        response = f"📍 **All Locations** ({len(locations)} total)\n\n"
+        parts = [f"📍 **All Locations** ({len(locations)} total)\n\n"]
         
         # Group by type
-        by_type = {}
+        by_type = defaultdict(list)
         for loc in locations:
-            loc_type = loc.get('type', 'unknown')
-            if loc_type not in by_type:
-                by_type[loc_type] = []
-            by_type[loc_type].append(loc)
+            by_type[loc.get('type', 'unknown')].append(loc)
         
         for loc_type, locs in by_type.items():
-            type_emoji = {"depot": "🏭", "warehouse": "🏢", "station": "🚉", "port": "⚓"}.get(loc_type, "📍")
-            response += f"**{type_emoji} {loc_type.title()}s:**\n"
-            for loc in locs:
-                response += f"• {loc.get('name')} ({loc.get('region')})\n"
-            response += "\n"
+            type_emoji = LOCATION_TYPE_EMOJI.get(loc_type, "📍")
+            parts.append(f"**{type_emoji} {loc_type.title()}s:**\n")
+            parts.extend(f"• {loc.get('name')} ({loc.get('region')})\n" for loc in locs)
+            parts.append("\n")
         
-        return response
+        return "".join(parts)
     except Exception as e:
         logger.error(f"Error getting locations: {e}")
         return f"Error getting locations: {str(e)}"
\ No newline at end of file
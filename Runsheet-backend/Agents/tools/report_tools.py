@@ -2,13 +2,37 @@
 Report generation tools for comprehensive analysis
 """
 
+import asyncio
 import logging
+from operator import itemgetter
 from datetime import datetime
 from strands import tool
 from services.elasticsearch_service import elasticsearch_service
 
 logger = logging.getLogger(__name__)
 
+# Emoji lookups, defaulting to 🟡 for anything not listed
+PRIORITY_EMOJI = {"urgent": "🚨", "high": "🔴"}
+INVENTORY_STATUS_EMOJI = {"out_of_stock": "🔴"}
+
+# Named counts for the operations report, keyed by index
+OPERATIONS_REPORT_FILTERS = {
+    "trucks": {
+        "total": {"match_all": {}},
+        "on_time": {"term": {"status": "on_time"}},
+        "delayed": {"term": {"status": "delayed"}}
+    },
+    "inventory": {
+        "total": {"match_all": {}},
+        "low_stock": {"term": {"status": "low_stock"}},
+        "out_of_stock": {"term": {"status": "out_of_stock"}}
+    },
+    "support_tickets": {
+        "urgent": {"term": {"priority": "urgent"}},
+        "open": {"term": {"status": "open"}}
+    }
+}
+
 @tool
 async def generate_operations_report() -> str:
     """
@@ -20,23 +44,25 @@ async def generate_operations_report() -> str:
     try:
         logger.info("📋 Generating operations report")
         
-        # Gather data from multiple sources
-        fleet_data = await elasticsearch_service.get_all_documents("trucks")
-        inventory_data = await elasticsearch_service.get_all_documents("inventory")
-        tickets_data = await elasticsearch_service.get_all_documents("support_tickets")
+        # Only counts are needed, so compute them all in one filters-aggregation round trip
+        counts = await elasticsearch_service.filter_counts(OPERATIONS_REPORT_FILTERS)
+        fleet_counts = counts["trucks"]
+        inventory_counts = counts["inventory"]
+        ticket_counts = counts["support_tickets"]
         
         # Calculate metrics
-        total_trucks = len(fleet_data)
-        on_time_trucks = len([t for t in fleet_data if t.get('status') == 'on_time'])
-        delayed_trucks = len([t for t in fleet_data if t.get('status') == 'delayed'])
+        total_trucks = fleet_counts["total"]
+        on_time_trucks = fleet_counts["on_time"]
+        delayed_trucks = fleet_counts["delayed"]
         
-        low_stock_items = len([i for i in inventory_data if i.get('status') == 'low_stock'])
-        out_of_stock_items = len([i for i in inventory_data if i.get('status') == 'out_of_stock'])
+        total_items = inventory_counts["total"]
+        low_stock_items = inventory_counts["low_stock"]
+        out_of_stock_items = inventory_counts["out_of_stock"]
         
-        urgent_tickets = len([t for t in tickets_data if t.get('priority') == 'urgent'])
-        open_tickets = len([t for t in tickets_data if t.get('status') == 'open'])
+        urgent_tickets = ticket_counts["urgent"]
+        open_tickets = ticket_counts["open"]
         
-        report = f"""# 📋 Operations Report
+        parts = [f"""# 📋 Operations Report
 *Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*
 
 ## 🚛 Fleet Status
@@ -45,7 +71,7 @@ async def generate_operations_report() -> str:
 - **Delayed**: {delayed_trucks} ({(delayed_trucks/total_trucks*100):.1f}%)
 
 ## 📦 Inventory Status
-- **Total Items**: {len(inventory_data)}
+- **Total Items**: {total_items}
 - **Low Stock Alerts**: {low_stock_items}
 - **Out of Stock**: {out_of_stock_items}
 
@@ -54,22 +80,22 @@ async def generate_operations_report() -> str:
 - **Urgent Issues**: {urgent_tickets}
 
 ## 🎯 Key Recommendations
-"""
+"""]
         
         # Add recommendations based on data
         if delayed_trucks > total_trucks * 0.3:
-            report += f"- ⚠️ **High delay rate** ({delayed_trucks} trucks delayed) - investigate route optimization\n"
+            parts.append(f"- ⚠️ **High delay rate** ({delayed_trucks} trucks delayed) - investigate route optimization\n")
         
         if out_of_stock_items > 0:
-            report += f"- 🚨 **Critical**: {out_of_stock_items} items out of stock - immediate restocking needed\n"
+            parts.append(f"- 🚨 **Critical**: {out_of_stock_items} items out of stock - immediate restocking needed\n")
         
         if urgent_tickets > 0:
-            report += f"- 🔥 **Urgent**: {urgent_tickets} urgent tickets require immediate attention\n"
+            parts.append(f"- 🔥 **Urgent**: {urgent_tickets} urgent tickets require immediate attention\n")
         
         if low_stock_items > 2:
-            report += f"- 📦 **Inventory**: {low_stock_items} items running low - schedule restocking\n"
+            parts.append(f"- 📦 **Inventory**: {low_stock_items} items running low - schedule restocking\n")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         logger.error(f"Error generating operations report: {e}")
@@ -87,56 +113,63 @@ async def generate_performance_report() -> str:
         logger.info("📊 Generating performance report")
         
         # Get analytics data
-        metrics = await elasticsearch_service.get_current_metrics()
-        routes = await elasticsearch_service.get_route_performance_data()
-        delays = await elasticsearch_service.get_delay_causes_data()
-        regions = await elasticsearch_service.get_regional_performance_data()
-        
-        report = f"""# 📊 Performance Analysis Report
+        metrics, routes, delays, regions = await asyncio.gather(
+            elasticsearch_service.get_current_metrics(),
+            elasticsearch_service.get_route_performance_data(),
+            elasticsearch_service.get_delay_causes_data(),
+            elasticsearch_service.get_regional_performance_data()
+        )
+        
+        parts = [f"""# 📊 Performance Analysis Report
 *Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*
 
 ## 🎯 Key Performance Indicators
-"""
+"""]
         
         for key, metric in metrics.items():
             trend_emoji = "📈" if metric.get("trend") == "up" else "📉"
-            report += f"- **{metric.get('title')}**: {metric.get('value')} {trend_emoji} ({metric.get('change')})\n"
+            parts.append(f"- **{metric.get('title')}**: {metric.get('value')} {trend_emoji} ({metric.get('change')})\n")
         
-        report += f"""
+        parts.append(f"""
 ## 🛣️ Route Performance
-"""
-        for route in sorted(routes, key=lambda x: x.get('performance', 0), reverse=True):
+""")
+        # Sort each series once and reuse the order for the insights below
+        sorted_routes = sorted(routes, key=itemgetter('performance'), reverse=True)
+        sorted_delays = sorted(delays, key=itemgetter('percentage'), reverse=True)
+        sorted_regions = sorted(regions, key=itemgetter('onTimePercentage'), reverse=True)
+        
+        for route in sorted_routes:
             performance = route.get('performance', 0)
             status_emoji = "🟢" if performance >= 90 else "🟡" if performance >= 80 else "🔴"
-            report += f"- {status_emoji} **{route.get('name')}**: {performance}%\n"
+            parts.append(f"- {status_emoji} **{route.get('name')}**: {performance}%\n")
         
-        report += f"""
+        parts.append(f"""
 ## ⏰ Delay Analysis
-"""
-        for cause in sorted(delays, key=lambda x: x.get('percentage', 0), reverse=True):
-            report += f"- **{cause.get('name')}**: {cause.get('percentage')}%\n"
+""")
+        for cause in sorted_delays:
+            parts.append(f"- **{cause.get('name')}**: {cause.get('percentage')}%\n")
         
-        report += f"""
+        parts.append(f"""
 ## 🌍 Regional Performance
-"""
-        for region in sorted(regions, key=lambda x: x.get('onTimePercentage', 0), reverse=True):
+""")
+        for region in sorted_regions:
             performance = region.get('onTimePercentage', 0)
             status_emoji = "🟢" if performance >= 90 else "🟡" if performance >= 80 else "🔴"
-            report += f"- {status_emoji} **{region.get('name')}**: {performance}% on-time\n"
+            parts.append(f"- {status_emoji} **{region.get('name')}**: {performance}% on-time\n")
         
         # Add insights
-        best_route = max(routes, key=lambda x: x.get('performance', 0))
-        worst_route = min(routes, key=lambda x: x.get('performance', 0))
-        main_delay = max(delays, key=lambda x: x.get('percentage', 0))
+        best_route = sorted_routes[0]
+        worst_route = sorted_routes[-1]
+        main_delay = sorted_delays[0]
         
-        report += f"""
+        parts.append(f"""
 ## 💡 Key Insights
 - 🏆 **Best performing route**: {best_route.get('name')} ({best_route.get('performance')}%)
 - 🎯 **Needs improvement**: {worst_route.get('name')} ({worst_route.get('performance')}%)
 - ⚠️ **Main delay cause**: {main_delay.get('name')} ({main_delay.get('percentage')}%)
-"""
+""")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         logger.error(f"Error generating performance report: {e}")
@@ -156,53 +189,58 @@ async def generate_incident_analysis(issue_description: str = "") -> str:
     try:
         logger.info(f"🔍 Generating incident analysis for: {issue_description}")
         
-        report = f"""# 🔍 Incident Analysis Report
+        parts = [f"""# 🔍 Incident Analysis Report
 *Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}*
 *Issue*: {issue_description or 'General system analysis'}
 
-"""
+"""]
         
-        # Get related support tickets
+        # Get related support tickets, delayed trucks and critical inventory concurrently
         if issue_description:
-            tickets = await elasticsearch_service.semantic_search("support_tickets", issue_description, ["issue", "description"], 5)
+            tickets_query = elasticsearch_service.semantic_search("support_tickets", issue_description, ["issue", "description"], 5)
         else:
-            tickets = await elasticsearch_service.get_all_documents("support_tickets")
-            tickets = [t for t in tickets if t.get('status') in ['open', 'in_progress']][:5]
+            tickets_query = elasticsearch_service.query("support_tickets", {"status": ["open", "in_progress"]}, 5)
+        
+        tickets, (delayed_trucks, delayed_count), critical_items = await asyncio.gather(
+            tickets_query,
+            elasticsearch_service.top_k(
+                "trucks", {"status": "delayed"}, "estimated_arrival", 5,
+                source_includes=["plate_number", "driver_name", "estimated_arrival"]
+            ),
+            elasticsearch_service.query(
+                "inventory", {"status": ["low_stock", "out_of_stock"]},
+                source_includes=["name", "quantity", "unit", "location", "status"]
+            )
+        )
         
         if tickets:
-            report += "## 🎫 Related Support Tickets\n"
+            parts.append("## 🎫 Related Support Tickets\n")
             for ticket in tickets:
-                priority_emoji = "🚨" if ticket.get('priority') == 'urgent' else "🔴" if ticket.get('priority') == 'high' else "🟡"
-                report += f"- {priority_emoji} **{ticket.get('ticket_id')}**: {ticket.get('issue')} ({ticket.get('status')})\n"
+                priority_emoji = PRIORITY_EMOJI.get(ticket.get('priority'), "🟡")
+                parts.append(f"- {priority_emoji} **{ticket.get('ticket_id')}**: {ticket.get('issue')} ({ticket.get('status')})\n")
         
         # Check for delayed trucks
-        trucks = await elasticsearch_service.get_all_documents("trucks")
-        delayed_trucks = [t for t in trucks if t.get('status') == 'delayed']
-        
         if delayed_trucks:
-            report += f"\n## 🚛 Affected Fleet ({len(delayed_trucks)} delayed trucks)\n"
-            for truck in delayed_trucks[:5]:
-                report += f"- **{truck.get('plate_number')}** - {truck.get('driver_name')} (ETA: {truck.get('estimated_arrival', 'Unknown')})\n"
+            parts.append(f"\n## 🚛 Affected Fleet ({delayed_count} delayed trucks)\n")
+            for truck in delayed_trucks:
+                parts.append(f"- **{truck.get('plate_number')}** - {truck.get('driver_name')} (ETA: {truck.get('estimated_arrival', 'Unknown')})\n")
         
         # Check inventory issues
-        inventory = await elasticsearch_service.get_all_documents("inventory")
-        critical_items = [i for i in inventory if i.get('status') in ['low_stock', 'out_of_stock']]
-        
         if critical_items:
-            report += f"\n## 📦 Inventory Issues ({len(critical_items)} items)\n"
+            parts.append(f"\n## 📦 Inventory Issues ({len(critical_items)} items)\n")
             for item in critical_items:
-                status_emoji = "🔴" if item.get('status') == 'out_of_stock' else "🟡"
-                report += f"- {status_emoji} **{item.get('name')}**: {item.get('quantity')} {item.get('unit')} at {item.get('location')}\n"
+                status_emoji = INVENTORY_STATUS_EMOJI.get(item.get('status'), "🟡")
+                parts.append(f"- {status_emoji} **{item.get('name')}**: {item.get('quantity')} {item.get('unit')} at {item.get('location')}\n")
         
-        report += f"""
+        parts.append(f"""
 ## 🎯 Recommended Actions
 - Review and prioritize urgent support tickets
 - Investigate root causes of delays
 - Ensure critical inventory is restocked
 - Monitor affected routes for improvements
-"""
+""")
         
-        return report
+        return "".join(parts)
         
     except Exception as e:
         logger.error(f"Error generating incident analysis: {e}")
@@ -2,12 +2,82 @@
 Search tools for the logistics agent
 """
 
+import asyncio
 import logging
 from strands import tool
 from services.elasticsearch_service import elasticsearch_service
 
 logger = logging.getLogger(__name__)
 
+# Fields searched for each index
+SEARCH_FIELDS = {
+    "trucks": ["cargo.description", "driver_name", "status"],
+    "orders": ["items", "customer"],
+    "support_tickets": ["issue", "description"],
+    "inventory": ["name"]
+}
+
+# Queries that ask for every document rather than a search
+ALL_TICKETS_QUERIES = frozenset({"all", "all tickets", "all support tickets", "support tickets"})
+ALL_INVENTORY_QUERIES = frozenset({"all", "everything", "all items", "all inventory", "inventory"})
+
+# Cap on documents an "all" listing puts into the model's context
+ALL_RESULTS_LIMIT = 50
+
+# Fields each listing formatter reads
+TICKET_FIELDS = ["ticket_id", "customer", "issue", "priority", "status", "description"]
+INVENTORY_FIELDS = ["name", "quantity", "unit", "location", "status"]
+
+# Inventory status emoji, defaulting to 🔴 (out of stock)
+INVENTORY_STATUS_EMOJI = {"in_stock": "🟢", "low_stock": "🟡"}
+
+def _format_truck(truck: dict) -> str:
+    parts = [
+        f"• **{truck.get('plate_number')}** - {truck.get('driver_name')}\n",
+        f"  Status: {truck.get('status')}\n"
+    ]
+    cargo = truck.get('cargo')
+    if cargo:
+        parts.append(f"  Cargo: {cargo.get('description', 'N/A')}\n")
+    parts.append(f"  Location: {truck.get('current_location', {}).get('name', 'Unknown')}\n\n")
+    return "".join(parts)
+
+def _format_order(order: dict) -> str:
+    return (
+        f"• **{order.get('order_id')}** - {order.get('customer')}\n"
+        f"  Status: {order.get('status')}\n"
+        f"  Value: ${order.get('value', 0):,.2f}\n"
+        f"  Items: {order.get('items', 'N/A')}\n"
+        f"  Priority: {order.get('priority', 'N/A')}\n\n"
+    )
+
+def _format_ticket(ticket: dict) -> str:
+    description = (ticket.get('description') or 'N/A')[:100]
+    return (
+        f"• **{ticket.get('ticket_id')}** - {ticket.get('customer')}\n"
+        f"  Issue: {ticket.get('issue')}\n"
+        f"  Priority: {ticket.get('priority')}\n"
+        f"  Status: {ticket.get('status')}\n"
+        f"  Description: {description}...\n\n"
+    )
+
+def _format_inventory_item(item: dict) -> str:
+    status_emoji = INVENTORY_STATUS_EMOJI.get(item.get('status'), "🔴")
+    return (
+        f"{status_emoji} **{item.get('name')}**\n"
+        f"  • Quantity: {item.get('quantity')} {item.get('unit')}\n"
+        f"  • Location: {item.get('location')}\n"
+        f"  • Status: {item.get('status')}\n\n"
+    )
+
+# Result heading and formatter for each index
+_RESULT_FORMATS = {
+    "trucks": ("🚛", "trucks", _format_truck),
+    "orders": ("📦", "orders", _format_order),
+    "support_tickets": ("🎫", "support tickets", _format_ticket),
+    "inventory": ("📦", "inventory items", _format_inventory_item)
+}
+
 @tool
 async def search_fleet_data(query: str) -> str:
     """
@@ -21,20 +91,15 @@ async def search_fleet_data(query: str) -> str:
     """
     try:
         logger.info(f"🔍 Searching fleet data for: {query}")
-        results = await elasticsearch_service.semantic_search("trucks", query, ["cargo.description", "driver_name", "status"], 5)
+        results = await elasticsearch_service.semantic_search("trucks", query, SEARCH_FIELDS["trucks"], 5)
         
         if not results:
             return f"No fleet data found for query: '{query}'"
         
-        response = f"🚛 Found {len(results)} trucks matching '{query}':\n\n"
-        for truck in results:
-            response += f"• **{truck.get('plate_number')}** - {truck.get('driver_name')}\n"
-            response += f"  Status: {truck.get('status')}\n"
-            if truck.get('cargo'):
-                response += f"  Cargo: {truck.get('cargo', {}).get('description', 'N/A')}\n"
-            response += f"  Location: {truck.get('current_location', {}).get('name', 'Unknown')}\n\n"
+        parts = [f"🚛 Found {len(results)} trucks matching '{query}':\n\n"]
+        parts.extend(_format_truck(truck) for truck in results)
         
-        return response
+        return "".join(parts)
     except Exception as e:
         logger.error(f"Error searching fleet data: {e}")
         return f"Error searching fleet data: {str(e)}"
@@ -52,20 +117,15 @@ async def search_orders(query: str) -> str:
     """
     try:
         logger.info(f"🔍 Searching orders for: {query}")
-        results = await elasticsearch_service.semantic_search("orders", query, ["items", "customer"], 5)
+        results = await elasticsearch_service.semantic_search("orders", query, SEARCH_FIELDS["orders"], 5)
         
         if not results:
             return f"No orders found for query: '{query}'"
         
-        response = f"📦 Found {len(results)} orders matching '{query}':\n\n"
-        for order in results:
-            response += f"• **{order.get('order_id')}** - {order.get('customer')}\n"
-            response += f"  Status: {order.get('status')}\n"
-            response += f"  Value: ${order.get('value', 0):,.2f}\n"
-            response += f"  Items: {order.get('items', 'N/A')}\n"
-            response += f"  Priority: {order.get('priority', 'N/A')}\n\n"
+        parts = [f"📦 Found {len(results)} orders matching '{query}':\n\n"]
+        parts.extend(_format_order(order) for order in results)
         
-        return response
+        return "".join(parts)
     except Exception as e:
         logger.error(f"Error searching orders: {e}")
         return f"Error searching orders: {str(e)}"
@@ -83,34 +143,38 @@ async def search_support_tickets(query: str) -> str:
     """
     try:
         logger.info(f"🔍 Searching support tickets for: {query}")
+        q = query.casefold().strip()
         
-        # First try semantic search
-        try:
-            results = await elasticsearch_service.semantic_search("support_tickets", query, ["issue", "description"], 5)
-        except Exception as search_error:
-            logger.warning(f"Semantic search failed, trying get_all_documents: {search_error}")
-            # Fallback to get all and filter
-            all_tickets = await elasticsearch_service.get_all_documents("support_tickets")
-            if query.lower() in ["all", "all support tickets", "support tickets"]:
-                results = all_tickets
-            else:
-                results = [ticket for ticket in all_tickets if 
-                          query.lower() in ticket.get('issue', '').lower() or 
-                          query.lower() in ticket.get('description', '').lower() or
-                          query.lower() in ticket.get('ticket_id', '').lower()]
+        truncated = False
+        if q in ALL_TICKETS_QUERIES:
+            # Listing everything needs no search round trip; one extra document shows whether the list was cut
+            results = await elasticsearch_service.get_all_documents(
+                "support_tickets", size=ALL_RESULTS_LIMIT + 1, source_includes=TICKET_FIELDS
+            )
+            truncated = len(results) > ALL_RESULTS_LIMIT
+            results = results[:ALL_RESULTS_LIMIT]
+        else:
+            # First try semantic search
+            try:
+                results = await elasticsearch_service.semantic_search("support_tickets", query, SEARCH_FIELDS["support_tickets"], 5)
+            except Exception as search_error:
+                logger.warning(f"Semantic search failed, trying get_all_documents: {search_error}")
+                # Fallback to get all and filter
+                all_tickets = await elasticsearch_service.get_all_documents("support_tickets")
+                results = [ticket for ticket in all_tickets
+                           if any(q in (ticket.get(field) or '').casefold()
+                                  for field in ("issue", "description", "ticket_id"))]
         
         if not results:
             return f"No support tickets found for query: '{query}'"
         
-        response = f"🎫 Found {len(results)} support tickets matching '{query}':\n\n"
-        for ticket in results:
-            response += f"• **{ticket.get('ticket_id')}** - {ticket.get('customer')}\n"
-            response += f"  Issue: {ticket.get('issue')}\n"
-            response += f"  Priority: {ticket.get('priority')}\n"
-            response += f"  Status: {ticket.get('status')}\n"
-            response += f"  Description: {ticket.get('description', 'N/A')[:100]}...\n\n"
+        if truncated:
+            parts = [f"🎫 Showing the first {len(results)} support tickets (list truncated; search for specific issues to narrow it down):\n\n"]
+        else:
+            parts = [f"🎫 Found {len(results)} support tickets matching '{query}':\n\n"]
+        parts.extend(_format_ticket(ticket) for ticket in results)
         
-        return response
+        return "".join(parts)
     except Exception as e:
         logger.error(f"Error searching support tickets: {e}")
         return f"Error searching support tickets: {str(e)}"
@@ -128,28 +192,80 @@ async def search_inventory(query: str) -> str:
     """
     try:
         logger.info(f"📦 Searching inventory for: {query}")
+        q = query.casefold().strip()
         
-        # First try semantic search
-        try:
-            results = await elasticsearch_service.semantic_search("inventory", query, ["name"], 10)
-        except Exception as search_error:
-            logger.warning(f"Semantic search failed, trying get_all_documents: {search_error}")
-            # Fallback to get all and filter
-            all_items = await elasticsearch_service.get_all_documents("inventory")
-            results = [item for item in all_items if query.lower() in item.get('name', '').lower()]
+        truncated = False
+        if q in ALL_INVENTORY_QUERIES:
+            # Listing everything needs no search round trip; one extra document shows whether the list was cut
+            results = await elasticsearch_service.get_all_documents(
+                "inventory", size=ALL_RESULTS_LIMIT + 1, source_includes=INVENTORY_FIELDS
+            )
+            truncated = len(results) > ALL_RESULTS_LIMIT
+            results = results[:ALL_RESULTS_LIMIT]
+        else:
+            # First try semantic search
+            try:
+                results = await elasticsearch_service.semantic_search("inventory", query, SEARCH_FIELDS["inventory"], 10)
+            except Exception as search_error:
+                logger.warning(f"Semantic search failed, trying get_all_documents: {search_error}")
+                # Fallback to get all and filter
+                all_items = await elasticsearch_service.get_all_documents("inventory")
+                results = [item for item in all_items if q in (item.get('name') or '').casefold()]
         
         if not results:
             return f"No inventory items found for: '{query}'"
         
-        response = f"📦 Found {len(results)} inventory items:\n\n"
-        for item in results:
-            status_emoji = "🟢" if item.get('status') == 'in_stock' else "🟡" if item.get('status') == 'low_stock' else "🔴"
-            response += f"{status_emoji} **{item.get('name')}**\n"
-            response += f"  • Quantity: {item.get('quantity')} {item.get('unit')}\n"
-            response += f"  • Location: {item.get('location')}\n"
-            response += f"  • Status: {item.get('status')}\n\n"
+        if truncated:
+            parts = [f"📦 Showing the first {len(results)} inventory items (list truncated; search for specific items to narrow it down):\n\n"]
+        else:
+            parts = [f"📦 Found {len(results)} inventory items:\n\n"]
+        parts.extend(_format_inventory_item(item) for item in results)
         
-        return response
+        return "".join(parts)
     except Exception as e:
         logger.error(f"Error searching inventory: {e}")
-        return f"Error searching inventory: {str(e)}"
\ No newline at end of file
+        return f"Error searching inventory: {str(e)}"
+
+@tool
+async def multi_search(queries: dict[str, str]) -> str:
+    """
+    Search several data sources at once using natural language.
+    
+    Args:
+        queries: Query per data source, keyed by "trucks", "orders", "support_tickets" or "inventory"
+                 (e.g., {"trucks": "delayed vehicles", "support_tickets": "delivery delays"})
+    
+    Returns:
+        Search results from each requested data source
+    """
+    try:
+        logger.info(f"🔍 Multi-search across: {list(queries)}")
+        
+        unknown = [index for index in queries if index not in SEARCH_FIELDS]
+        if unknown:
+            return f"Unknown data sources: {', '.join(unknown)}. Use: {', '.join(SEARCH_FIELDS)}"
+        
+        # Issue every search concurrently
+        indices = list(queries)
+        all_results = await asyncio.gather(
+            *(elasticsearch_service.semantic_search(index, queries[index], SEARCH_FIELDS[index], 5) for index in indices),
+            return_exceptions=True
+        )
+        
+        parts = []
+        for index, results in zip(indices, all_results):
+            emoji, label, format_result = _RESULT_FORMATS[index]
+            query = queries[index]
+            if isinstance(results, Exception):
+                logger.error(f"Error searching {index}: {results}")
+                parts.append(f"{emoji} Error searching {label}: {str(results)}\n\n")
+            elif not results:
+                parts.append(f"{emoji} No {label} found for query: '{query}'\n\n")
+            else:
+                parts.append(f"{emoji} Found {len(results)} {label} matching '{query}':\n\n")
+                parts.extend(format_result(result) for result in results)
+        
+        return "".join(parts)
+    except Exception as e:
+        logger.error(f"Error in multi-search: {e}")
+        return f"Error in multi-search: {str(e)}"
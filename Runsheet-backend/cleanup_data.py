@@ -4,6 +4,7 @@ Elasticsearch Data Cleanup Script
 Clears duplicate data and reseeds with fresh data
 """
 
+import argparse
 import asyncio
 import logging
 import sys
@@ -16,7 +17,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-async def main():
+async def main(mode: str):
     """Main cleanup function"""
     try:
         print("🧹 Starting Elasticsearch data cleanup...")
@@ -27,16 +28,25 @@ async def main():
         await data_seeder.clear_all_data()
         print("✅ Existing data cleared")
         
-        # Reseed with baseline morning data
-        print("\n🌅 Step 2: Seeding baseline morning operations...")
-        await data_seeder.seed_baseline_data(operational_time="09:00")
-        print("✅ Baseline morning data seeded")
+        if mode == "full":
+            # Reseed with the full mock dataset
+            print("\n🌱 Step 2: Seeding full mock dataset...")
+            await data_seeder.seed_all_data(force=True)
+            print("✅ Full mock data seeded")
+        else:
+            # Reseed with baseline morning data
+            print("\n🌅 Step 2: Seeding baseline morning operations...")
+            await data_seeder.seed_baseline_data(operational_time="09:00")
+            print("✅ Baseline morning data seeded")
         
         print("\n" + "=" * 50)
         print("🎉 Cleanup completed successfully!")
-        print("📊 Your Elasticsearch indices now have baseline morning operations data")
-        print("🔄 Ready for temporal data demo - upload afternoon/evening data via frontend")
-        print("💡 Use the Data Upload component to simulate operational changes")
+        if mode == "full":
+            print("📊 Your Elasticsearch indices now have the full mock dataset")
+        else:
+            print("📊 Your Elasticsearch indices now have baseline morning operations data")
+            print("🔄 Ready for temporal data demo - upload afternoon/evening data via frontend")
+            print("💡 Use the Data Upload component to simulate operational changes")
         
     except Exception as e:
         logger.error(f"❌ Cleanup failed: {e}")
@@ -44,6 +54,15 @@ async def main():
         sys.exit(1)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Clear Elasticsearch indices and reseed demo data")
+    parser.add_argument(
+        "--mode",
+        choices=["baseline", "full"],
+        required=True,
+        help="baseline: morning operations demo data; full: complete mock dataset"
+    )
+    args = parser.parse_args()
+    
     print("Runsheet Logistics - Data Cleanup Script")
     print("This will clear all existing data and reseed with fresh data.")
     
@@ -54,4 +73,4 @@ if __name__ == "__main__":
         sys.exit(0)
     
     # Run cleanup
-    asyncio.run(main())
\ No newline at end of file
+    asyncio.run(main(args.mode))
\ No newline at end of file
@@ -3,18 +3,44 @@ Data API endpoints for Runsheet Logistics Platform
 Provides Elasticsearch-powered data endpoints
 """
 
-from fastapi import APIRouter, HTTPException, UploadFile, File, Form
-from pydantic import BaseModel
-from typing import List, Optional
-from datetime import datetime
-import random
+from fastapi import APIRouter, HTTPException, UploadFile, File, Form, Header, Response
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from pydantic_core import to_json
+from typing import Any, List, Optional
+from datetime import datetime, timezone
+from functools import lru_cache
+from tempfile import SpooledTemporaryFile
+import asyncio
+import codecs
+import hashlib
+import csv
+import itertools
 import logging
+import time
 from services.elasticsearch_service import elasticsearch_service
+from services.cache import cached
+from services.csv_documents import csv_row_builder, iter_csv_documents
+from services.reshape import (
+    TRUCK_LIST_ADAPTER,
+    INVENTORY_LIST_ADAPTER,
+    ORDER_LIST_ADAPTER,
+    SUPPORT_TICKET_LIST_ADAPTER,
+    TruckOut,
+    reshape,
+    compact_trucks
+)
 
 logger = logging.getLogger(__name__)
 
+class PydanticJSONResponse(JSONResponse):
+    """JSON response rendered by pydantic-core's Rust serializer instead of json.dumps"""
+    
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
 # Create router for data endpoints
-router = APIRouter(prefix="/api")
+router = APIRouter(prefix="/api", default_response_class=PydanticJSONResponse)
 
 # Data Models
 class Location(BaseModel):
@@ -53,12 +79,8 @@ class Truck(BaseModel):
     lastUpdate: str
     cargo: Optional[CargoInfo] = None
 
-class FleetSummary(BaseModel):
-    totalTrucks: int
-    activeTrucks: int
-    onTimeTrucks: int
-    delayedTrucks: int
-    averageDelay: float
+class TruckBatchRequest(BaseModel):
+    ids: List[str]
 
 class InventoryItem(BaseModel):
     id: str
@@ -93,31 +115,32 @@ class SupportTicket(BaseModel):
     assignedTo: Optional[str] = None
     relatedOrder: Optional[str] = None
 
-# Mock Data Functions
+# Mock Data Functions (built once from trusted literals without validation; callers that modify the models should model_copy(deep=True) first)
+@lru_cache(maxsize=1)
 def get_mock_locations():
     return [
-        Location(
+        Location.model_construct(
             id="nairobi-station",
             name="Nairobi Station",
             type="station",
             coordinates={"lat": -1.2921, "lng": 36.8219},
             address="Nairobi, Kenya"
         ),
-        Location(
+        Location.model_construct(
             id="mombasa-port",
             name="Mombasa Port",
             type="station",
             coordinates={"lat": -4.0435, "lng": 39.6682},
             address="Mombasa, Kenya"
         ),
-        Location(
+        Location.model_construct(
             id="kisumu-depot",
             name="Kisumu Depot",
             type="depot",
             coordinates={"lat": -0.0917, "lng": 34.7680},
             address="Kisumu, Kenya"
         ),
-        Location(
+        Location.model_construct(
             id="kinara-warehouse",
             name="Kinara Warehouse",
             type="warehouse",
@@ -126,9 +149,10 @@ def get_mock_locations():
         )
     ]
 
+@lru_cache(maxsize=1)
 def get_mock_trucks():
     locations = get_mock_locations()
-    route = Route(
+    route = Route.model_construct(
         id="kisumu-mombasa",
         origin=locations[2],
         destination=locations[1],
@@ -138,7 +162,7 @@ def get_mock_trucks():
     )
     
     return [
-        Truck(
+        Truck.model_construct(
             id="GI-58A",
             plateNumber="GI-58A",
             driverId="driver-001",
@@ -149,7 +173,7 @@ def get_mock_trucks():
             status="on_time",
             estimatedArrival="2024-01-15T14:15:00Z",
             lastUpdate="2024-01-15T12:00:00Z",
-            cargo=CargoInfo(
+            cargo=CargoInfo.model_construct(
                 type="General Cargo",
                 weight=15000,
                 volume=45,
@@ -157,7 +181,7 @@ def get_mock_trucks():
                 priority="medium"
             )
         ),
-        Truck(
+        Truck.model_construct(
             id="MO-84A",
             plateNumber="MO-84A",
             driverId="driver-002",
@@ -168,7 +192,7 @@ def get_mock_trucks():
             status="delayed",
             estimatedArrival="2024-01-15T16:25:00Z",
             lastUpdate="2024-01-15T12:05:00Z",
-            cargo=CargoInfo(
+            cargo=CargoInfo.model_construct(
                 type="Perishables",
                 weight=8000,
                 volume=25,
@@ -176,7 +200,7 @@ def get_mock_trucks():
                 priority="high"
             )
         ),
-        Truck(
+        Truck.model_construct(
             id="CE-57A",
             plateNumber="CE-57A",
             driverId="driver-003",
@@ -188,7 +212,7 @@ def get_mock_trucks():
             estimatedArrival="2024-01-15T12:25:00Z",
             lastUpdate="2024-01-15T12:10:00Z"
         ),
-        Truck(
+        Truck.model_construct(
             id="AL-94J",
             plateNumber="AL-94J",
             driverId="driver-004",
@@ -200,7 +224,7 @@ def get_mock_trucks():
             estimatedArrival="2024-01-15T12:25:00Z",
             lastUpdate="2024-01-15T12:15:00Z"
         ),
-        Truck(
+        Truck.model_construct(
             id="PL-56A",
             plateNumber="PL-56A",
             driverId="driver-005",
@@ -212,7 +236,7 @@ def get_mock_trucks():
             estimatedArrival="2024-01-15T12:25:00Z",
             lastUpdate="2024-01-15T12:20:00Z"
         ),
-        Truck(
+        Truck.model_construct(
             id="DU-265",
             plateNumber="DU-265",
             driverId="driver-006",
@@ -226,9 +250,10 @@ def get_mock_trucks():
         )
     ]
 
+@lru_cache(maxsize=1)
 def get_mock_inventory():
     return [
-        InventoryItem(
+        InventoryItem.model_construct(
             id="INV-001",
             name="Diesel Fuel",
             category="Fuel",
@@ -238,7 +263,7 @@ def get_mock_inventory():
             status="in_stock",
             lastUpdated="2024-01-15T10:30:00Z"
         ),
-        InventoryItem(
+        InventoryItem.model_construct(
             id="INV-002",
             name="Spare Tires",
             category="Parts",
@@ -248,7 +273,7 @@ def get_mock_inventory():
             status="low_stock",
             lastUpdated="2024-01-15T09:15:00Z"
         ),
-        InventoryItem(
+        InventoryItem.model_construct(
             id="INV-003",
             name="Engine Oil",
             category="Maintenance",
@@ -258,7 +283,7 @@ def get_mock_inventory():
             status="out_of_stock",
             lastUpdated="2024-01-14T16:45:00Z"
         ),
-        InventoryItem(
+        InventoryItem.model_construct(
             id="INV-004",
             name="Brake Pads",
             category="Parts",
@@ -268,7 +293,7 @@ def get_mock_inventory():
             status="in_stock",
             lastUpdated="2024-01-15T08:20:00Z"
         ),
-        InventoryItem(
+        InventoryItem.model_construct(
             id="INV-005",
             name="Coolant Fluid",
             category="Maintenance",
@@ -280,9 +305,10 @@ def get_mock_inventory():
         )
     ]
 
+@lru_cache(maxsize=1)
 def get_mock_orders():
     return [
-        Order(
+        Order.model_construct(
             id="ORD-001",
             customer="Safaricom Ltd",
             status="in_transit",
@@ -294,7 +320,7 @@ def get_mock_orders():
             deliveryEta="2024-01-15T14:00:00Z",
             priority="high"
         ),
-        Order(
+        Order.model_construct(
             id="ORD-002",
             customer="Kenya Power",
             status="pending",
@@ -305,7 +331,7 @@ def get_mock_orders():
             deliveryEta="2024-01-16T16:00:00Z",
             priority="medium"
         ),
-        Order(
+        Order.model_construct(
             id="ORD-003",
             customer="Equity Bank",
             status="delivered",
@@ -317,7 +343,7 @@ def get_mock_orders():
             deliveryEta="2024-01-14T12:00:00Z",
             priority="urgent"
         ),
-        Order(
+        Order.model_construct(
             id="ORD-004",
             customer="Tusker Breweries",
             status="in_transit",
@@ -329,7 +355,7 @@ def get_mock_orders():
             deliveryEta="2024-01-15T18:00:00Z",
             priority="medium"
         ),
-        Order(
+        Order.model_construct(
             id="ORD-005",
             customer="Naivas Supermarket",
             status="pending",
@@ -342,9 +368,10 @@ def get_mock_orders():
         )
     ]
 
+@lru_cache(maxsize=1)
 def get_mock_support_tickets():
     return [
-        SupportTicket(
+        SupportTicket.model_construct(
             id="TKT-001",
             customer="Safaricom Ltd",
             issue="Delivery Delay",
@@ -354,7 +381,7 @@ def get_mock_support_tickets():
             createdAt="2024-01-15T09:30:00Z",
             relatedOrder="ORD-001"
         ),
-        SupportTicket(
+        SupportTicket.model_construct(
             id="TKT-002",
             customer="Kenya Power",
             issue="Damaged Goods",
@@ -365,7 +392,7 @@ def get_mock_support_tickets():
             assignedTo="John Kamau",
             relatedOrder="ORD-002"
         ),
-        SupportTicket(
+        SupportTicket.model_construct(
             id="TKT-003",
             customer="Equity Bank",
             issue="Invoice Query",
@@ -375,7 +402,7 @@ def get_mock_support_tickets():
             createdAt="2024-01-14T14:20:00Z",
             assignedTo="Mary Wanjiku"
         ),
-        SupportTicket(
+        SupportTicket.model_construct(
             id="TKT-004",
             customer="Nakumatt Holdings",
             issue="Missing Items",
@@ -384,7 +411,7 @@ def get_mock_support_tickets():
             status="open",
             createdAt="2024-01-15T13:45:00Z"
         ),
-        SupportTicket(
+        SupportTicket.model_construct(
             id="TKT-005",
             customer="Tusker Breweries",
             issue="Route Change Request",
@@ -398,262 +425,349 @@ def get_mock_support_tickets():
 
 # API Endpoints
 
+def json_response(content: dict) -> Response:
+    """Serialize a response body with pydantic-core, skipping jsonable_encoder and json.dumps"""
+    return PydanticJSONResponse(content)
+
+# (epoch second, ISO string, ISO bytes) for the last formatted envelope timestamp
+_timestamp = (0, "", b"")
+
+def _current_timestamp() -> tuple:
+    """Format the envelope timestamp at most once per second"""
+    global _timestamp
+    second = int(time.time())
+    if second != _timestamp[0]:
+        iso = datetime.fromtimestamp(second, timezone.utc).isoformat()
+        _timestamp = (second, iso, iso.encode())
+    return _timestamp
+
+def now_iso() -> str:
+    """Current UTC time for response envelopes, to the second"""
+    return _current_timestamp()[1]
+
+def ok(data: Any, **extra: Any) -> Response:
+    """Build the standard {data, success, timestamp} response envelope"""
+    return json_response({"data": data, **extra, "success": True, "timestamp": now_iso()})
+
+def etag_payload(data: Any) -> tuple:
+    """Serialize data once with its ETag, so the pair can be cached independently of any client's If-None-Match"""
+    data_json = to_json(data)
+    return data_json, f'"{hashlib.md5(data_json).hexdigest()}"'
+
+def conditional_ok(payload: tuple, if_none_match: Optional[str], max_age: int = 60) -> Response:
+    """Standard envelope for an etag_payload, answering 304 when the client already has it"""
+    data_json, etag = payload
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    
+    # Proxies that compress responses may weaken the tag to W/"..."
+    if if_none_match and etag in {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}:
+        return Response(status_code=304, headers=headers)
+    
+    body = b'{"data":' + data_json + b',"success":true,"timestamp":"' + _current_timestamp()[2] + b'"}'
+    return Response(content=body, media_type="application/json", headers=headers)
+
+def json_array(items_json) -> bytes:
+    """Join already-serialized JSON values into a JSON array"""
+    return b"[" + b",".join(items_json) + b"]"
+
+# Mock trucks keyed by ID, so single-truck lookups are one dict hit on pre-serialized bytes
+MOCK_TRUCK_JSON_BY_ID = {truck.id: to_json(truck) for truck in get_mock_trucks()}
+
+# Mock data serialized once at import; each X-Mock: 1 response only splices in a fresh timestamp
+MOCK_DATA_JSON = {
+    # The list reuses each truck's serialized bytes instead of encoding the trucks a second time
+    "trucks": json_array(MOCK_TRUCK_JSON_BY_ID.values()),
+    "inventory": to_json(get_mock_inventory()),
+    "orders": to_json(get_mock_orders()),
+    "support_tickets": to_json(get_mock_support_tickets())
+}
+
+def mock_response(data_json: bytes) -> Response:
+    """Serve pre-serialized mock data in the standard envelope"""
+    body = b'{"data":' + data_json + b',"success":true,"timestamp":"' + _current_timestamp()[2] + b'"}'
+    return Response(content=body, media_type="application/json")
+
+def ndjson_response(index: str, adapter: TypeAdapter) -> StreamingResponse:
+    """Stream every document in an index as reshaped NDJSON, one search_after page at a time"""
+    async def lines():
+        async for batch in elasticsearch_service.iter_document_batches(
+            index, source_includes=SOURCE_FIELDS[index]
+        ):
+            yield b"".join(to_json(item) + b"\n" for item in reshape(adapter, batch))
+    
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+# Source fields each index's output model reads, so Elasticsearch only sends those
+SOURCE_FIELDS = {
+    "trucks": [
+        "truck_id", "plate_number", "driver_id", "driver_name", "current_location", "destination",
+        "route.id", "route.distance", "route.estimated_duration", "route.actual_duration",
+        "status", "estimated_arrival", "last_update", "cargo"
+    ],
+    "inventory": ["item_id", "name", "category", "quantity", "unit", "location", "status", "last_updated"],
+    "orders": [
+        "order_id", "customer", "status", "value", "items", "truck_id", "region",
+        "created_at", "delivery_eta", "priority"
+    ],
+    "support_tickets": [
+        "ticket_id", "customer", "issue", "description", "priority", "status",
+        "created_at", "assigned_to", "related_order"
+    ]
+}
+
+# Source fields read by /search for each index
+SEARCH_SOURCE_FIELDS = {
+    "orders": ["order_id", "customer", "status", "value", "items", "region", "priority"],
+    "trucks": ["truck_id", "plate_number", "driver_name", "status", "cargo"],
+    "support_tickets": ["ticket_id", "customer", "issue", "description", "priority", "status"]
+}
+
+# Fields returned by /search for each index
+ORDER_SEARCH_FIELDS = {"id", "customer", "status", "value", "items", "region", "priority"}
+TRUCK_SEARCH_FIELDS = {"id", "plateNumber", "driverName", "status", "cargo"}
+SUPPORT_TICKET_SEARCH_FIELDS = {"id", "customer", "issue", "description", "priority", "status"}
+
+# Per-index /search setup: fields to match against, output adapter and returned fields
+_FORMATTERS = {
+    "orders": (["items", "customer"], ORDER_LIST_ADAPTER, ORDER_SEARCH_FIELDS),
+    "trucks": (["cargo.description", "driver_name"], TRUCK_LIST_ADAPTER, TRUCK_SEARCH_FIELDS),
+    "support_tickets": (["issue", "description"], SUPPORT_TICKET_LIST_ADAPTER, SUPPORT_TICKET_SEARCH_FIELDS)
+}
+
 # Fleet Management
 @router.get("/fleet/summary")
+@cached(ttl=10)
 async def get_fleet_summary():
     try:
-        trucks = await elasticsearch_service.get_all_documents("trucks")
+        # Counts come from a terms aggregation, so no truck documents are transferred
+        status_counts = await elasticsearch_service.status_counts("trucks")
+        on_time = status_counts.get("on_time", 0)
+        delayed = status_counts.get("delayed", 0)
         
-        summary = FleetSummary(
-            totalTrucks=len(trucks),
-            activeTrucks=len([t for t in trucks if t.get("status") in ['on_time', 'delayed']]),
-            onTimeTrucks=len([t for t in trucks if t.get("status") == 'on_time']),
-            delayedTrucks=len([t for t in trucks if t.get("status") == 'delayed']),
-            averageDelay=45
-        )
-        
-        return {
-            "data": summary.dict(),
-            "success": True,
-            "timestamp": datetime.now().isoformat()
-        }
+        # All fields are already scalars, so the envelope is serialized without a model round trip
+        return ok({
+            "totalTrucks": sum(status_counts.values()),
+            "activeTrucks": on_time + delayed,
+            "onTimeTrucks": on_time,
+            "delayedTrucks": delayed,
+            "averageDelay": 45.0
+        })
     except Exception as e:
         logger.error(f"Error getting fleet summary: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/fleet/trucks")
-async def get_trucks():
+@cached(ttl=10)
+async def get_trucks(compact: bool = False, x_mock: bool = Header(False)):
+    if x_mock:
+        return mock_response(MOCK_DATA_JSON["trucks"])
+    
     try:
-        trucks = await elasticsearch_service.get_all_documents("trucks")
+        trucks = await elasticsearch_service.get_all_documents("trucks", source_includes=SOURCE_FIELDS["trucks"])
+        
+        if compact:
+            return ok(compact_trucks(trucks))
         
         # Convert to Truck model format for consistency
-        formatted_trucks = []
-        for truck in trucks:
-            # Build route with origin and destination for frontend compatibility
-            route_data = truck.get("route", {})
-            current_location = truck.get("current_location", {})
-            destination = truck.get("destination", {})
-            
-            formatted_route = {
-                "id": route_data.get("id", ""),
-                "origin": current_location,
-                "destination": destination,
-                "waypoints": [],
-                "distance": route_data.get("distance", 0),
-                "estimatedDuration": route_data.get("estimated_duration", 0),
-                "actualDuration": route_data.get("actual_duration")
-            }
-            
-            formatted_truck = {
-                "id": truck.get("truck_id"),
-                "plateNumber": truck.get("plate_number"),
-                "driverId": truck.get("driver_id"),
-                "driverName": truck.get("driver_name"),
-                "currentLocation": current_location,
-                "destination": destination,
-                "route": formatted_route,
-                "status": truck.get("status"),
-                "estimatedArrival": truck.get("estimated_arrival"),
-                "lastUpdate": truck.get("last_update"),
-                "cargo": truck.get("cargo")
-            }
-            formatted_trucks.append(formatted_truck)
+        formatted_trucks = reshape(TRUCK_LIST_ADAPTER, trucks)
         
-        return {
-            "data": formatted_trucks,
-            "success": True,
-            "timestamp": datetime.now().isoformat()
-        }
+        return ok(formatted_trucks)
     except Exception as e:
         logger.error(f"Error getting trucks: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/fleet/trucks/stream")
+async def stream_trucks():
+    """Stream all trucks as NDJSON without building the full list in memory"""
+    return ndjson_response("trucks", TRUCK_LIST_ADAPTER)
+
 @router.get("/fleet/trucks/{truck_id}")
-async def get_truck_by_id(truck_id: str):
+async def get_truck_by_id(truck_id: str, x_mock: bool = Header(False)):
+    if x_mock:
+        truck_json = MOCK_TRUCK_JSON_BY_ID.get(truck_id)
+        if truck_json is None:
+            raise HTTPException(status_code=404, detail="Truck not found")
+        return mock_response(truck_json)
+    
     try:
         truck = await elasticsearch_service.get_document("trucks", truck_id)
         
         # Convert to Truck model format
-        route_data = truck.get("route", {})
-        current_location = truck.get("current_location", {})
-        destination = truck.get("destination", {})
+        formatted_truck = TruckOut.model_validate(truck).model_dump()
         
-        formatted_route = {
-            "id": route_data.get("id", ""),
-            "origin": current_location,
-            "destination": destination,
-            "waypoints": [],
-            "distance": route_data.get("distance", 0),
-            "estimatedDuration": route_data.get("estimated_duration", 0),
-            "actualDuration": route_data.get("actual_duration")
-        }
-        
-        formatted_truck = {
-            "id": truck.get("truck_id"),
-            "plateNumber": truck.get("plate_number"),
-            "driverId": truck.get("driver_id"),
-            "driverName": truck.get("driver_name"),
-            "currentLocation": current_location,
-            "destination": destination,
-            "route": formatted_route,
-            "status": truck.get("status"),
-            "estimatedArrival": truck.get("estimated_arrival"),
-            "lastUpdate": truck.get("last_update"),
-            "cargo": truck.get("cargo")
-        }
-        
-        return {
-            "data": formatted_truck,
-            "success": True,
-            "timestamp": datetime.now().isoformat()
-        }
+        return ok(formatted_truck)
     except Exception as e:
         logger.error(f"Error getting truck {truck_id}: {e}")
         raise HTTPException(status_code=404, detail="Truck not found")
 
+@router.post("/fleet/trucks/batch")
+async def get_trucks_batch(request: TruckBatchRequest):
+    """Get several trucks by ID in a single Elasticsearch round trip"""
+    try:
+        trucks = await elasticsearch_service.mget_documents(
+            "trucks", request.ids, SOURCE_FIELDS["trucks"]
+        ) if request.ids else []
+        
+        return ok(reshape(TRUCK_LIST_ADAPTER, trucks))
+    except Exception as e:
+        logger.error(f"Error getting trucks batch: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Inventory Management
 @router.get("/inventory")
-async def get_inventory():
+@cached(ttl=60)
+async def get_inventory(x_mock: bool = Header(False)):
+    if x_mock:
+        return mock_response(MOCK_DATA_JSON["inventory"])
+    
     try:
-        inventory = await elasticsearch_service.get_all_documents("inventory")
+        inventory = await elasticsearch_service.get_all_documents("inventory", source_includes=SOURCE_FIELDS["inventory"])
         
         # Convert to InventoryItem model format
-        formatted_inventory = []
-        for item in inventory:
-            formatted_item = {
-                "id": item.get("item_id"),
-                "name": item.get("name"),
-                "category": item.get("category"),
-                "quantity": item.get("quantity"),
-                "unit": item.get("unit"),
-                "location": item.get("location"),
-                "status": item.get("status"),
-                "lastUpdated": item.get("last_updated")
-            }
-            formatted_inventory.append(formatted_item)
+        formatted_inventory = reshape(INVENTORY_LIST_ADAPTER, inventory)
         
-        return {
-            "data": formatted_inventory,
-            "success": True,
-            "timestamp": datetime.now().isoformat()
-        }
+        return ok(formatted_inventory)
     except Exception as e:
         logger.error(f"Error getting inventory: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/inventory/stream")
+async def stream_inventory():
+    """Stream all inventory items as NDJSON without building the full list in memory"""
+    return ndjson_response("inventory", INVENTORY_LIST_ADAPTER)
+
 # Orders Management
 @router.get("/orders")
-async def get_orders():
+@cached(ttl=60)
+async def get_orders(x_mock: bool = Header(False)):
+    if x_mock:
+        return mock_response(MOCK_DATA_JSON["orders"])
+    
     try:
-        orders = await elasticsearch_service.get_all_documents("orders")
+        orders = await elasticsearch_service.get_all_documents("orders", source_includes=SOURCE_FIELDS["orders"])
         
         # Convert to Order model format
-        formatted_orders = []
-        for order in orders:
-            formatted_order = {
-                "id": order.get("order_id"),
-                "customer": order.get("customer"),
-                "status": order.get("status"),
-                "value": order.get("value"),
-                "items": order.get("items"),
-                "truckId": order.get("truck_id"),
-                "region": order.get("region"),
-                "createdAt": order.get("created_at"),
-                "deliveryEta": order.get("delivery_eta"),
-                "priority": order.get("priority")
-            }
-            formatted_orders.append(formatted_order)
+        formatted_orders = reshape(ORDER_LIST_ADAPTER, orders)
         
-        return {
-            "data": formatted_orders,
-            "success": True,
-            "timestamp": datetime.now().isoformat()
-        }
+        return ok(formatted_orders)
     except Exception as e:
         logger.error(f"Error getting orders: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/orders/stream")
+async def stream_orders():
+    """Stream all orders as NDJSON without building the full list in memory"""
+    return ndjson_response("orders", ORDER_LIST_ADAPTER)
+
 # Support Management
 @router.get("/support/tickets")
-async def get_support_tickets():
+@cached(ttl=60)
+async def get_support_tickets(x_mock: bool = Header(False)):
+    if x_mock:
+        return mock_response(MOCK_DATA_JSON["support_tickets"])
+    
     try:
-        tickets = await elasticsearch_service.get_all_documents("support_tickets")
+        tickets = await elasticsearch_service.get_all_documents("support_tickets", source_includes=SOURCE_FIELDS["support_tickets"])
         
         # Convert to SupportTicket model format
-        formatted_tickets = []
-        for ticket in tickets:
-            formatted_ticket = {
-                "id": ticket.get("ticket_id"),
-                "customer": ticket.get("customer"),
-                "issue": ticket.get("issue"),
-                "description": ticket.get("description"),
-                "priority": ticket.get("priority"),
-                "status": ticket.get("status"),
-                "createdAt": ticket.get("created_at"),
-                "assignedTo": ticket.get("assigned_to"),
-                "relatedOrder": ticket.get("related_order")
-            }
-            formatted_tickets.append(formatted_ticket)
+        formatted_tickets = reshape(SUPPORT_TICKET_LIST_ADAPTER, tickets)
         
-        return {
-            "data": formatted_tickets,
-            "success": True,
-            "timestamp": datetime.now().isoformat()
-        }
+        return ok(formatted_tickets)
     except Exception as e:
         logger.error(f"Error getting support tickets: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# Dashboard
+@router.get("/dashboard")
+@cached(ttl=10)
+async def get_dashboard():
+    """Get trucks, inventory, orders and support tickets in one response"""
+    try:
+        # One _msearch covers every index that isn't already cached
+        documents = await elasticsearch_service.get_all_documents_multi({
+            "trucks": SOURCE_FIELDS["trucks"],
+            "inventory": SOURCE_FIELDS["inventory"],
+            "orders": SOURCE_FIELDS["orders"],
+            "support_tickets": SOURCE_FIELDS["support_tickets"]
+        })
+        
+        return ok({
+            "trucks": reshape(TRUCK_LIST_ADAPTER, documents["trucks"]),
+            "inventory": reshape(INVENTORY_LIST_ADAPTER, documents["inventory"]),
+            "orders": reshape(ORDER_LIST_ADAPTER, documents["orders"]),
+            "supportTickets": reshape(SUPPORT_TICKET_LIST_ADAPTER, documents["support_tickets"])
+        })
+    except Exception as e:
+        logger.error(f"Error getting dashboard data: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Analytics
+# Payloads are cached without the client ETag; each request compares If-None-Match against the shared entry
+@cached(ttl=300)
+async def _analytics_metrics_payload():
+    return etag_payload(await elasticsearch_service.get_current_metrics())
+
 @router.get("/analytics/metrics")
-async def get_analytics_metrics(timeRange: str = "7d"):
-    metrics = await elasticsearch_service.get_current_metrics()
-    return {
-        "data": metrics,
-        "success": True,
-        "timestamp": datetime.now().isoformat()
-    }
+async def get_analytics_metrics(timeRange: str = "7d", if_none_match: Optional[str] = Header(None)):
+    return conditional_ok(await _analytics_metrics_payload(), if_none_match)
+
+@cached(ttl=300)
+async def _route_performance_payload():
+    return etag_payload(await elasticsearch_service.get_route_performance_data())
 
 @router.get("/analytics/routes")
-async def get_route_performance():
-    routes = await elasticsearch_service.get_route_performance_data()
-    return {
-        "data": routes,
-        "success": True,
-        "timestamp": datetime.now().isoformat()
-    }
+async def get_route_performance(if_none_match: Optional[str] = Header(None)):
+    return conditional_ok(await _route_performance_payload(), if_none_match)
+
+@cached(ttl=300)
+async def _delay_causes_payload():
+    return etag_payload(await elasticsearch_service.get_delay_causes_data())
 
 @router.get("/analytics/delay-causes")
-async def get_delay_causes():
-    causes = await elasticsearch_service.get_delay_causes_data()
-    return {
-        "data": causes,
-        "success": True,
-        "timestamp": datetime.now().isoformat()
-    }
+async def get_delay_causes(if_none_match: Optional[str] = Header(None)):
+    return conditional_ok(await _delay_causes_payload(), if_none_match)
+
+@cached(ttl=300)
+async def _regional_performance_payload():
+    return etag_payload(await elasticsearch_service.get_regional_performance_data())
 
 @router.get("/analytics/regional")
-async def get_regional_performance():
-    regions = await elasticsearch_service.get_regional_performance_data()
-    return {
-        "data": regions,
-        "success": True,
-        "timestamp": datetime.now().isoformat()
-    }
+async def get_regional_performance(if_none_match: Optional[str] = Header(None)):
+    return conditional_ok(await _regional_performance_payload(), if_none_match)
 
 @router.get("/analytics/time-series")
+@cached(ttl=300)
 async def get_time_series_data(metric: str = "delivery_performance_pct", timeRange: str = "7d"):
     """Get time-series data for trending charts"""
     event_type = "hourly_metrics" if timeRange == "24h" else "daily_performance"
     data = await elasticsearch_service.get_time_series_data(event_type, metric, timeRange)
     
-    return {
-        "data": data,
-        "metric": metric,
-        "timeRange": timeRange,
-        "success": True,
-        "timestamp": datetime.now().isoformat()
-    }
+    return ok(data, metric=metric, timeRange=timeRange)
+
+@router.get("/analytics/bundle")
+@cached(ttl=300)
+async def get_analytics_bundle(metric: str = "delivery_performance_pct", timeRange: str = "7d"):
+    """Get every analytics dataset in one response, fetched concurrently"""
+    try:
+        event_type = "hourly_metrics" if timeRange == "24h" else "daily_performance"
+        metrics, routes, causes, regions, time_series = await asyncio.gather(
+            elasticsearch_service.get_current_metrics(),
+            elasticsearch_service.get_route_performance_data(),
+            elasticsearch_service.get_delay_causes_data(),
+            elasticsearch_service.get_regional_performance_data(),
+            elasticsearch_service.get_time_series_data(event_type, metric, timeRange)
+        )
+        
+        return ok({
+            "metrics": metrics,
+            "routes": routes,
+            "delayCauses": causes,
+            "regional": regions,
+            "timeSeries": time_series
+        }, metric=metric, timeRange=timeRange)
+    except Exception as e:
+        logger.error(f"Error getting analytics bundle: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
 
 # Semantic Search
 @router.get("/search")
@@ -662,64 +776,17 @@ async def semantic_search(q: str, index: str = "orders", limit: int = 10):
     Perform semantic search across different indices
     """
     try:
-        if index == "orders":
-            results = await elasticsearch_service.semantic_search(
-                "orders", q, ["items", "customer"], limit
-            )
-            # Format results
-            formatted_results = []
-            for result in results:
-                formatted_result = {
-                    "id": result.get("order_id"),
-                    "customer": result.get("customer"),
-                    "status": result.get("status"),
-                    "value": result.get("value"),
-                    "items": result.get("items"),
-                    "region": result.get("region"),
-                    "priority": result.get("priority")
-                }
-                formatted_results.append(formatted_result)
-            
-        elif index == "trucks":
-            results = await elasticsearch_service.semantic_search(
-                "trucks", q, ["cargo.description", "driver_name"], limit
-            )
-            formatted_results = []
-            for result in results:
-                formatted_result = {
-                    "id": result.get("truck_id"),
-                    "plateNumber": result.get("plate_number"),
-                    "driverName": result.get("driver_name"),
-                    "status": result.get("status"),
-                    "cargo": result.get("cargo")
-                }
-                formatted_results.append(formatted_result)
-                
-        elif index == "support_tickets":
-            results = await elasticsearch_service.semantic_search(
-                "support_tickets", q, ["issue", "description"], limit
-            )
-            formatted_results = []
-            for result in results:
-                formatted_result = {
-                    "id": result.get("ticket_id"),
-                    "customer": result.get("customer"),
-                    "issue": result.get("issue"),
-                    "description": result.get("description"),
-                    "priority": result.get("priority"),
-                    "status": result.get("status")
-                }
-                formatted_results.append(formatted_result)
-        else:
+        formatter = _FORMATTERS.get(index)
+        if not formatter:
             raise HTTPException(status_code=400, detail="Invalid index. Use: orders, trucks, or support_tickets")
         
-        return {
-            "data": formatted_results,
-            "query": q,
-            "index": index,
-            "success": True,
-            "timestamp": datetime.now().isoformat()
-        }
+        search_fields, adapter, include = formatter
+        results = await elasticsearch_service.semantic_search(
+            index, q, search_fields, limit, source_includes=SEARCH_SOURCE_FIELDS[index]
+        )
+        formatted_results = reshape(adapter, results, include)
+        
+        return ok(formatted_results, query=q, index=index)
     except Exception as e:
         logger.error(f"Error in semantic search: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -740,31 +807,67 @@ async def cleanup_duplicate_data():
         return {
             "message": "Data cleanup and reseed completed successfully",
             "success": True,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
     except Exception as e:
         logger.error(f"Error during data cleanup: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 # Data Upload
+# Upload data types that are named differently from their index
+UPLOAD_INDICES = {"fleet": "trucks", "support": "support_tickets"}
+UPLOAD_READ_SIZE = 1 << 20
+UPLOAD_SPOOL_SIZE = 8 << 20
+_UPLOAD_COUNTER = itertools.count(100)
+# Rejected rows echoed back when an upload partially fails
+UPLOAD_ERROR_SAMPLE = 5
+
+def bulk_error_summary(error: dict) -> dict:
+    """Reduce a bulk helper error item to the document ID and Elasticsearch's reason"""
+    item = next(iter(error.values()), {})
+    reason = item.get("error")
+    if isinstance(reason, dict):
+        reason = reason.get("reason", reason.get("type"))
+    return {"id": item.get("_id"), "status": item.get("status"), "reason": reason}
+
+async def spool_upload(file: UploadFile) -> SpooledTemporaryFile:
+    """Copy an upload in 1 MiB chunks into a rewound spool that moves to disk past 8 MiB"""
+    spool = SpooledTemporaryFile(max_size=UPLOAD_SPOOL_SIZE)
+    while chunk := await file.read(UPLOAD_READ_SIZE):
+        spool.write(chunk)
+    spool.seek(0)
+    return spool
+
 @router.post("/data/upload/sheets")
 async def upload_from_sheets(request: dict):
-    # Simulate processing
-    record_count = random.randint(50, 150)
+    # Simulate processing with a lock-free counter instead of the shared global RNG
+    record_count = next(_UPLOAD_COUNTER) % 100 + 50
     
-    return {
-        "data": {"recordCount": record_count},
-        "success": True,
-        "timestamp": datetime.now().isoformat()
-    }
+    return ok({"recordCount": record_count})
 
 @router.post("/data/upload/csv")
 async def upload_csv(file: UploadFile = File(...), dataType: str = Form(...)):
-    # Simulate processing
-    record_count = random.randint(100, 300)
+    index = UPLOAD_INDICES.get(dataType, dataType)
+    if index not in SOURCE_FIELDS:
+        raise HTTPException(status_code=400, detail=f"Unsupported data type: {dataType}")
+    
+    try:
+        with await spool_upload(file) as spool:
+            # Rows are parsed and converted to mapped documents lazily while the bulk helper sends them in chunks
+            rows = csv.DictReader(codecs.iterdecode(spool, "utf-8-sig"))
+            builder = csv_row_builder(dataType, rows.fieldnames)
+            record_count, errors = await elasticsearch_service.bulk_index_stream(index, iter_csv_documents(rows, builder))
+    except Exception as e:
+        logger.error(f"Error uploading CSV: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    if errors:
+        logger.error(f"CSV upload to {index} rejected {len(errors)} documents")
+        raise HTTPException(status_code=422, detail={
+            "message": f"{len(errors)} rows failed to index",
+            "recordCount": record_count,
+            "failedCount": len(errors),
+            "errors": [bulk_error_summary(error) for error in errors[:UPLOAD_ERROR_SAMPLE]]
+        })
     
-    return {
-        "data": {"recordCount": record_count},
-        "success": True,
-        "timestamp": datetime.now().isoformat()
-    }
\ No newline at end of file
+    return ok({"recordCount": record_count})
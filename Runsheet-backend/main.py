@@ -1,23 +1,32 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import json
+from pydantic_core import to_json
 import logging
 import asyncio
+import os
+import codecs
 import csv
-import io
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
 from Agents.mainagent import LogisticsAgent
-from data_endpoints import router as data_router
+from data_endpoints import router as data_router, PydanticJSONResponse, spool_upload, now_iso
 from services.data_seeder import data_seeder
+from services.csv_documents import csv_row_builder, convert_csv_rows_to_documents
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize FastAPI app
-app = FastAPI(title="Runsheet Logistics API", version="1.0.0")
+app = FastAPI(
+    title="Runsheet Logistics API",
+    version="1.0.0",
+    default_response_class=PydanticJSONResponse
+)
 
 # Add CORS middleware
 app.add_middleware(
@@ -33,23 +42,54 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize the logistics agent
-logistics_agent = LogisticsAgent()
+class StreamAwareGZipMiddleware(GZipMiddleware):
+    """GZip responses except the streamed chat, whose chunks must reach the client as they are produced"""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/api/chat":
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+# Compress JSON list responses; repeated keys and status values shrink them several times over,
+# and level 5 keeps most of level 9's ratio at a fraction of the CPU
+app.add_middleware(StreamAwareGZipMiddleware, minimum_size=1024, compresslevel=5)
 
 # Include data endpoints
 app.include_router(data_router)
 
+def _seeding_done(task: asyncio.Task):
+    """Log how background seeding ended and mark the app as ready"""
+    app.state.seed_ready.set()
+    if task.cancelled():
+        logger.warning("⚠️ Elasticsearch seeding was cancelled")
+    elif task.exception():
+        # Don't fail the app, just log the error
+        logger.error(f"❌ Failed to seed Elasticsearch data: {task.exception()}")
+    else:
+        logger.info("✅ Baseline data seeding completed! Ready for temporal demo.")
+
 @app.on_event("startup")
 async def startup_event():
-    """Initialize Elasticsearch data on startup"""
+    """Start Elasticsearch seeding in the background so the API serves immediately"""
+    logger.info("🚀 Starting Runsheet Logistics API...")
+    logger.info("🌅 Seeding Elasticsearch with baseline morning data...")
+    app.state.seed_ready = asyncio.Event()
+    app.state.seed_task = asyncio.create_task(data_seeder.seed_baseline_data(operational_time="09:00"))
+    app.state.seed_task.add_done_callback(_seeding_done)
+    
+    # Built here rather than at import, so importing the app (or forking workers) doesn't build the agent
+    app.state.logistics_agent = LogisticsAgent()
     try:
-        logger.info("🚀 Starting Runsheet Logistics API...")
-        logger.info("🌅 Seeding Elasticsearch with baseline morning data...")
-        await data_seeder.seed_baseline_data(operational_time="09:00")
-        logger.info("✅ Baseline data seeding completed! Ready for temporal demo.")
+        await app.state.logistics_agent.ainit()
     except Exception as e:
-        logger.error(f"❌ Failed to seed Elasticsearch data: {e}")
-        # Don't fail startup, just log the error
+        logger.error(f"❌ Failed to initialize logistics agent: {e}")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop any unfinished seeding and release the shared Elasticsearch connection pool"""
+    app.state.seed_task.cancel()
+    data_seeder.es_service.close()
 
 class ChatRequest(BaseModel):
     message: str
@@ -67,53 +107,127 @@ class TemporalUploadRequest(BaseModel):
 @app.get("/")
 async def root():
     """Health check endpoint"""
-    return {"message": "Runsheet Logistics API is running"}
+    return PydanticJSONResponse({"message": "Runsheet Logistics API is running"})
+
+def sse_frame(payload: dict) -> bytes:
+    """Encode one server-sent event frame with pydantic-core"""
+    return b"data: " + to_json(payload) + b"\n\n"
+
+def sse_text_frame(text: str) -> bytes:
+    """Encode a streamed text token frame without building a payload dict per token"""
+    return b'data: {"type":"text","content":' + to_json(text) + b'}\n\n'
+
+SSE_DONE_FRAME = b'data: {"type":"done"}\n\n'
+
+# Frame builders for single-key agent events, keyed by that key (None means send nothing).
+# Text tokens are passed through as str so the chat producer can coalesce them before framing
+SINGLE_KEY_EVENT_FRAMES = {
+    "data": lambda event: event["data"] or None,
+    "error": lambda event: sse_frame({'error': event['error']})
+}
+
+# Frames buffered between the agent and a slow client
+CHAT_STREAM_BUFFER = 64
+
+# SSE comment sent while the agent is quiet (e.g. long tool calls) so proxies don't time out the stream
+SSE_KEEPALIVE_FRAME = b": ping\n\n"
+CHAT_KEEPALIVE_INTERVAL = 15
 
 @app.post("/api/chat")
-async def chat_endpoint(request: ChatRequest):
+async def chat_endpoint(request: ChatRequest, http_request: Request):
     """
     Streaming chat endpoint for the logistics AI assistant
     """
     try:
         logger.info(f"🔴 BACKEND: Chat request received - Mode: {request.mode}, Message: {request.message[:100]}...")
         
-        async def generate_response():
+        async def chat_frames():
             logger.info(f"🟠 BACKEND: Starting generate_response for message: {request.message[:50]}...")
             try:
-                async for event in logistics_agent.chat_streaming(request.message, request.mode):
+                async for event in app.state.logistics_agent.chat_streaming(request.message, request.mode):
                     # Handle streaming events according to Strands documentation
                     if isinstance(event, dict):
-                        if "error" in event:
-                            yield f"data: {json.dumps({'error': event['error']})}\n\n"
+                        # Batched text tokens arrive as single-key events; resolve them with one lookup
+                        if len(event) == 1 and (build_frame := SINGLE_KEY_EVENT_FRAMES.get(next(iter(event)))):
+                            frame = build_frame(event)
+                            if frame:
+                                yield frame
+                        elif "error" in event:
+                            yield sse_frame({'error': event['error']})
+                        elif event.get("type") == "error":
+                            # Agent-side failures (e.g. retries exhausted) carry their message as content
+                            yield sse_frame({'error': event.get('content', '')})
                         elif "data" in event:
                             # This is the actual streaming text data
                             text = event["data"]
                             if text:
-                                yield f"data: {json.dumps({'type': 'text', 'content': text})}\n\n"
+                                yield text
                         elif "current_tool_use" in event:
                             # Tool is being invoked
                             tool_info = event["current_tool_use"]
-                            yield f"data: {json.dumps({'type': 'tool', 'tool_name': tool_info.get('name', ''), 'tool_input': tool_info.get('input', {})})}\n\n"
+                            yield sse_frame({'type': 'tool', 'tool_name': tool_info.get('name', ''), 'tool_input': tool_info.get('input', {})})
                         elif "current_tool_result" in event:
                             # Tool result received
                             tool_result = event["current_tool_result"]
-                            yield f"data: {json.dumps({'type': 'tool_result', 'tool_name': tool_result.get('name', ''), 'tool_output': tool_result.get('output', '')})}\n\n"
+                            yield sse_frame({'type': 'tool_result', 'tool_name': tool_result.get('name', ''), 'tool_output': tool_result.get('output', '')})
                         elif event.get('event') == 'messageStop' or 'result' in event:
                             # Message is complete
-                            yield f"data: {json.dumps({'type': 'done'})}\n\n"
+                            yield SSE_DONE_FRAME
                             break
                 
             except Exception as e:
                 logger.error(f"Error in chat streaming: {e}")
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
+                yield sse_frame({'error': str(e)})
+        
+        async def generate_response():
+            # A background task drives the agent into a bounded queue, so a slow client
+            # doesn't stall the model stream until the buffer fills
+            queue = asyncio.Queue(maxsize=CHAT_STREAM_BUFFER)
+            
+            async def produce():
+                # While the client lags and the queue is full, text tokens are merged
+                # into one pending frame instead of piling up
+                pending_text = []
+                async for item in chat_frames():
+                    if isinstance(item, str):
+                        pending_text.append(item)
+                        if queue.full():
+                            continue
+                        item = sse_text_frame("".join(pending_text))
+                        pending_text.clear()
+                    elif pending_text:
+                        await queue.put(sse_text_frame("".join(pending_text)))
+                        pending_text.clear()
+                    await queue.put(item)
+                if pending_text:
+                    await queue.put(sse_text_frame("".join(pending_text)))
+                await queue.put(None)
+            
+            producer = asyncio.create_task(produce())
+            try:
+                while True:
+                    try:
+                        frame = await asyncio.wait_for(queue.get(), CHAT_KEEPALIVE_INTERVAL)
+                    except asyncio.TimeoutError:
+                        if await http_request.is_disconnected():
+                            break
+                        yield SSE_KEEPALIVE_FRAME
+                        continue
+                    if frame is None:
+                        break
+                    yield frame
+            finally:
+                # Stop the agent if the client disconnected mid-stream
+                producer.cancel()
         
         return StreamingResponse(
             generate_response(),
-            media_type="text/plain",
+            media_type="text/event-stream",
             headers={
                 "Cache-Control": "no-cache",
                 "Connection": "keep-alive",
-                "Content-Type": "text/plain; charset=utf-8"
+                # Stop nginx from buffering the stream
+                "X-Accel-Buffering": "no"
             }
         )
         
@@ -129,12 +243,12 @@ async def chat_fallback_endpoint(request: ChatRequest):
     try:
         logger.info(f"🔄 BACKEND: Fallback chat request - Mode: {request.mode}, Message: {request.message[:50]}...")
         
-        response = await logistics_agent.chat_fallback(request.message, request.mode)
+        response = await app.state.logistics_agent.chat_fallback(request.message, request.mode)
         
         return {
             "response": response,
             "mode": request.mode,
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
         
     except Exception as e:
@@ -147,7 +261,7 @@ async def clear_chat_endpoint(request: ClearChatRequest):
     Clear the chat history/memory
     """
     try:
-        logistics_agent.clear_memory()
+        app.state.logistics_agent.clear_memory()
         return {"message": "Chat memory cleared successfully"}
     except Exception as e:
         logger.error(f"Error clearing chat: {e}")
@@ -161,6 +275,7 @@ async def reset_demo():
         
         # Clear all existing data
         await data_seeder.clear_all_data()
+        load_demo_sheet.cache_clear()
         
         # Reseed with baseline morning data
         await data_seeder.seed_baseline_data(operational_time="09:00")
@@ -168,7 +283,7 @@ async def reset_demo():
         return {
             "success": True,
             "message": "Demo reset to baseline morning operations",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso(),
             "state": "morning_baseline"
         }
         
@@ -181,7 +296,7 @@ async def get_demo_status():
     """Get current demo state"""
     try:
         # Check what data exists to determine current state
-        trucks = await data_seeder.es_service.get_all_documents("trucks")
+        trucks = await data_seeder.es_service.get_all_documents("trucks", source_includes=["batch_id"])
         
         # Analyze data to determine current time period
         current_state = "unknown"
@@ -199,12 +314,13 @@ async def get_demo_status():
             else:
                 current_state = "morning_baseline"
         
-        return {
+        # Returned as a Response so FastAPI skips jsonable_encoder on this polled endpoint
+        return PydanticJSONResponse({
             "success": True,
             "current_state": current_state,
             "total_trucks": len(trucks),
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": now_iso()
+        })
         
     except Exception as e:
         logger.error(f"Failed to get demo status: {e}")
@@ -223,46 +339,76 @@ async def upload_csv_temporal(
     try:
         logger.info(f"📊 CSV Upload: {data_type} batch {batch_id} at {operational_time}")
         
-        # Read CSV content
-        content = await file.read()
-        csv_content = content.decode('utf-8')
-        
-        # Parse CSV data
-        documents = []
-        csv_reader = csv.DictReader(io.StringIO(csv_content))
-        
-        for row in csv_reader:
-            # Convert CSV row to document format based on data type
-            doc = convert_csv_row_to_document(row, data_type)
-            if doc:
-                documents.append(doc)
+        # Parse CSV rows straight from the chunked spool and upsert them in fixed-size chunks,
+        # so neither the raw file nor the full document list is held in memory
+        record_count = 0
+        index_name = None
+        with await spool_upload(file) as spool:
+            csv_reader = csv.DictReader(codecs.iterdecode(spool, 'utf-8-sig'))
+            builder = csv_row_builder(data_type, csv_reader.fieldnames)
+            while rows := list(islice(csv_reader, CSV_UPLOAD_CHUNK_ROWS)):
+                documents = convert_csv_rows_to_documents(rows, builder)
+                if not documents:
+                    continue
+                
+                # Upsert the chunk with temporal metadata; one refresh follows the last chunk
+                result = await data_seeder.upsert_batch_data(
+                    data_type=data_type,
+                    documents=documents,
+                    batch_id=batch_id,
+                    operational_time=operational_time,
+                    refresh=False
+                )
+                record_count += result["recordCount"]
+                index_name = result["index"]
         
-        if not documents:
+        if not record_count:
             raise HTTPException(status_code=400, detail="No valid data found in CSV")
         
-        # Upsert the data with temporal metadata
-        result = await data_seeder.upsert_batch_data(
-            data_type=data_type,
-            documents=documents,
-            batch_id=batch_id,
-            operational_time=operational_time
-        )
+        await data_seeder.es_service.refresh_indices([index_name])
         
         return {
             "data": {
-                "recordCount": len(documents),
+                "recordCount": record_count,
                 "batch_id": batch_id,
                 "operational_time": operational_time
             },
             "success": True,
-            "message": f"Successfully uploaded {len(documents)} {data_type} records",
-            "timestamp": datetime.now().isoformat()
+            "message": f"Successfully uploaded {record_count} {data_type} records",
+            "timestamp": now_iso()
         }
         
     except Exception as e:
         logger.error(f"CSV upload error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def upsert_demo_sheets(data_types: list, batch_id: str, operational_time: str) -> dict:
+    """Upsert the demo sheet for each data type concurrently, returning record counts by data type"""
+    sheets = {}
+    for data_type in data_types:
+        documents = generate_demo_sheets_data(data_type, batch_id)
+        if documents:
+            sheets[data_type] = documents
+    
+    # Each data type writes its own index, so the bulk requests can run side by side
+    outcomes = await asyncio.gather(
+        *(
+            data_seeder.upsert_batch_data(
+                data_type=data_type,
+                documents=documents,
+                batch_id=batch_id,
+                operational_time=operational_time
+            )
+            for data_type, documents in sheets.items()
+        ),
+        return_exceptions=True
+    )
+    for outcome in outcomes:
+        if isinstance(outcome, Exception):
+            raise outcome
+    
+    return {data_type: len(documents) for data_type, documents in sheets.items()}
+
 @app.post("/api/upload/batch")
 async def upload_batch_temporal(request: TemporalUploadRequest):
     """
@@ -272,20 +418,8 @@ async def upload_batch_temporal(request: TemporalUploadRequest):
         logger.info(f"📊 Batch Upload: All data types for {request.batch_id} at {request.operational_time}")
         
         data_types = ["fleet", "orders", "inventory", "support"]
-        total_records = 0
-        results = {}
-        
-        for data_type in data_types:
-            documents = generate_demo_sheets_data(data_type, request.batch_id)
-            if documents:
-                result = await data_seeder.upsert_batch_data(
-                    data_type=data_type,
-                    documents=documents,
-                    batch_id=request.batch_id,
-                    operational_time=request.operational_time
-                )
-                total_records += len(documents)
-                results[data_type] = len(documents)
+        results = await upsert_demo_sheets(data_types, request.batch_id, request.operational_time)
+        total_records = sum(results.values())
         
         return {
             "data": {
@@ -296,7 +430,7 @@ async def upload_batch_temporal(request: TemporalUploadRequest):
             },
             "success": True,
             "message": f"Successfully uploaded complete operational snapshot with {total_records} total records",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
         
     except Exception as e:
@@ -316,20 +450,8 @@ async def upload_selective_temporal(request: SelectiveUploadRequest):
     try:
         logger.info(f"📊 Selective Upload: {request.data_types} for {request.batch_id} at {request.operational_time}")
         
-        total_records = 0
-        results = {}
-        
-        for data_type in request.data_types:
-            documents = generate_demo_sheets_data(data_type, request.batch_id)
-            if documents:
-                result = await data_seeder.upsert_batch_data(
-                    data_type=data_type,
-                    documents=documents,
-                    batch_id=request.batch_id,
-                    operational_time=request.operational_time
-                )
-                total_records += len(documents)
-                results[data_type] = len(documents)
+        results = await upsert_demo_sheets(request.data_types, request.batch_id, request.operational_time)
+        total_records = sum(results.values())
         
         return {
             "data": {
@@ -340,7 +462,7 @@ async def upload_selective_temporal(request: SelectiveUploadRequest):
             },
             "success": True,
             "message": f"Successfully uploaded {len(request.data_types)} data types with {total_records} total records",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
         
     except Exception as e:
@@ -378,137 +500,18 @@ async def upload_sheets_temporal(request: TemporalUploadRequest):
             },
             "success": True,
             "message": f"Successfully uploaded {len(documents)} {request.data_type} records from sheets",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": now_iso()
         }
         
     except Exception as e:
         logger.error(f"Sheets upload error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-def convert_csv_row_to_document(row: dict, data_type: str) -> dict:
-    """Convert CSV row to Elasticsearch document format"""
-    
-    def create_location_object(location_name: str, lat: float = None, lon: float = None):
-        """Create a proper location object by reading from locations CSV"""
-        import os
-        
-        # Load locations from CSV file
-        locations_path = os.path.join("demo-data", "locations.csv")
-        location_map = {}
-        
-        try:
-            if os.path.exists(locations_path):
-                with open(locations_path, 'r', encoding='utf-8') as file:
-                    locations_reader = csv.DictReader(file)
-                    for loc_row in locations_reader:
-                        location_map[loc_row['name']] = {
-                            "id": loc_row['location_id'],
-                            "name": loc_row['name'],
-                            "type": loc_row['type'],
-                            "coordinates": {"lat": float(loc_row['lat']), "lon": float(loc_row['lon'])},
-                            "address": loc_row['address']
-                        }
-        except Exception as e:
-            logger.error(f"Error loading locations CSV: {e}")
-        
-        # Try to find exact match first
-        if location_name in location_map:
-            return location_map[location_name]
-        
-        # If custom coordinates provided, create dynamic location
-        if lat is not None and lon is not None:
-            return {
-                "id": location_name.lower().replace(" ", "-").replace(",", ""),
-                "name": location_name,
-                "type": "location",
-                "coordinates": {"lat": lat, "lon": lon},
-                "address": f"{location_name}, Kenya"
-            }
-        
-        # Default fallback to Nairobi if no match
-        return {
-            "id": "nairobi-station",
-            "name": "Nairobi Station",
-            "type": "station", 
-            "coordinates": {"lat": -1.2921, "lon": 36.8219},
-            "address": "Nairobi, Kenya"
-        }
-    
-    try:
-        if data_type == "trucks" or data_type == "fleet":
-            # Get coordinates if available
-            lat = float(row.get("lat", 0)) if row.get("lat") else None
-            lon = float(row.get("lon", 0)) if row.get("lon") else None
-            
-            current_location_name = row.get("current_location", row.get("location", "Nairobi Station"))
-            destination_name = row.get("destination", "Mombasa Port")
-            
-            return {
-                "truck_id": row.get("truck_id"),
-                "plate_number": row.get("plate_number", row.get("truck_id")),
-                "driver_id": f"driver-{row.get('truck_id', 'unknown')}",
-                "driver_name": row.get("driver_name", row.get("driver")),
-                "status": row.get("status", "on_time"),
-                "current_location": create_location_object(current_location_name, lat, lon),
-                "destination": create_location_object(destination_name),
-                "route": {
-                    "id": f"{current_location_name.lower().replace(' ', '-')}-{destination_name.lower().replace(' ', '-')}",
-                    "distance": 500.0,  # Default distance
-                    "estimated_duration": 300,  # Default 5 hours
-                    "actual_duration": None
-                },
-                "estimated_arrival": row.get("estimated_arrival", row.get("eta")),
-                "last_update": datetime.now().isoformat() + "Z",
-                "cargo": {
-                    "type": row.get("cargo_type", row.get("cargo", "General Cargo")),
-                    "weight": 10000.0,  # Default weight
-                    "volume": 30.0,     # Default volume
-                    "description": row.get("cargo_description", row.get("description", "Standard cargo")),
-                    "priority": "medium"
-                }
-            }
-        
-        elif data_type == "orders":
-            return {
-                "order_id": row.get("order_id"),
-                "customer": row.get("customer"),
-                "status": row.get("status", "pending"),
-                "value": float(row.get("value", 0)) if row.get("value") else 0,
-                "items": row.get("items", row.get("description")),
-                "region": row.get("region"),
-                "priority": row.get("priority", "medium"),
-                "truck_id": row.get("truck_id")
-            }
-        
-        elif data_type == "inventory":
-            return {
-                "item_id": row.get("item_id"),
-                "name": row.get("name", row.get("item_name")),
-                "category": row.get("category"),
-                "quantity": int(row.get("quantity", 0)) if row.get("quantity") else 0,
-                "unit": row.get("unit"),
-                "location": row.get("location"),
-                "status": row.get("status", "in_stock")
-            }
-        
-        elif data_type == "support_tickets" or data_type == "support":
-            return {
-                "ticket_id": row.get("ticket_id"),
-                "customer": row.get("customer"),
-                "issue": row.get("issue"),
-                "description": row.get("description"),
-                "priority": row.get("priority", "medium"),
-                "status": row.get("status", "open")
-            }
-        
-        return None
-    except Exception as e:
-        logger.error(f"Error converting CSV row: {e}")
-        return None
+# Rows converted and upserted per chunk during CSV uploads
+CSV_UPLOAD_CHUNK_ROWS = 1000
 
 def generate_demo_sheets_data(data_type: str, batch_id: str) -> list:
     """Generate demo data by reading from CSV files"""
-    import os
     
     # Determine time period from batch_id
     time_period = "morning"  # default
@@ -519,6 +522,18 @@ def generate_demo_sheets_data(data_type: str, batch_id: str) -> list:
     elif "night" in batch_id.lower():
         time_period = "night"
     
+    # Upserts stamp metadata onto each document, so hand out copies of the cached rows
+    # with a fresh last_update rather than the parse-time one
+    now = datetime.now().isoformat() + "Z"
+    return [
+        {**doc, "last_update": now} if "last_update" in doc else dict(doc)
+        for doc in load_demo_sheet(data_type, time_period)
+    ]
+
+@lru_cache(maxsize=64)
+def load_demo_sheet(data_type: str, time_period: str) -> tuple:
+    """Read and convert a static demo CSV once per process; cleared on demo reset"""
+    
     # Map data types to CSV file names
     data_type_mapping = {
         "trucks": "fleet",
@@ -536,43 +551,39 @@ def generate_demo_sheets_data(data_type: str, batch_id: str) -> list:
     # Check if CSV file exists
     if not os.path.exists(csv_path):
         logger.warning(f"CSV file not found: {csv_path}")
-        return []
+        return ()
     
     try:
         # Read CSV and convert to documents
-        documents = []
         with open(csv_path, 'r', encoding='utf-8') as file:
             csv_reader = csv.DictReader(file)
-            for row in csv_reader:
-                doc = convert_csv_row_to_document(row, data_type)
-                if doc:
-                    documents.append(doc)
+            builder = csv_row_builder(data_type, csv_reader.fieldnames)
+            documents = tuple(convert_csv_rows_to_documents(csv_reader, builder))
         
         logger.info(f"Loaded {len(documents)} records from {csv_filename}")
         return documents
         
     except Exception as e:
         logger.error(f"Error reading CSV file {csv_path}: {e}")
-        return []
-    
-    # If no specific time period matched, return empty list
-    logger.warning(f"⚠️ No demo data generated for data_type={data_type}, batch_id={batch_id}")
-    return []
+        return ()
 
 @app.get("/api/health")
 async def health_check():
     """
     Health check endpoint for monitoring
     """
-    return {
-        "status": "healthy",
+    return PydanticJSONResponse({
+        "status": "healthy" if app.state.seed_ready.is_set() else "seeding",
         "service": "Runsheet Logistics API",
         "agent": "LogisticsAgent",
         "version": "1.0.0"
-    }
+    })
 
 if __name__ == "__main__":
     import uvicorn
-    import os
     port = int(os.environ.get("PORT", 8080))
-    uvicorn.run(app, host="0.0.0.0", port=port, log_level="info")
+    # Single worker by default: chat memory, demo seeding and the response/document caches are
+    # per process, so extra workers (opt in via WEB_CONCURRENCY) would not share history or cache
+    # invalidation. uvicorn picks uvloop and httptools automatically when installed
+    workers = int(os.environ.get("WEB_CONCURRENCY", "1"))
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=workers, log_level="info")
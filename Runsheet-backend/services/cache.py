@@ -0,0 +1,51 @@
+"""
+Response cache for read-only API endpoints
+Keeps endpoint results in process memory for a short TTL
+"""
+
+import asyncio
+import functools
+import logging
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Every endpoint cache, so writes can clear them all at once
+_caches = []
+
+def cached(ttl: float, maxsize: int = 32):
+    """Cache an async endpoint's result per set of arguments for ttl seconds"""
+    def decorator(func):
+        cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        locks = {}
+        _caches.append(cache)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            result = cache.get(key)
+            if result is not None:
+                return result
+
+            # Coalesce concurrent misses for the same arguments into one call
+            lock = locks.setdefault(key, asyncio.Lock())
+            try:
+                async with lock:
+                    result = cache.get(key)
+                    if result is None:
+                        result = await func(*args, **kwargs)
+                        cache[key] = result
+            finally:
+                # Drop the lock once the fill is done so one isn't kept per argument set ever requested
+                if locks.get(key) is lock and not lock.locked():
+                    del locks[key]
+            return result
+
+        return wrapper
+    return decorator
+
+def clear_cache():
+    """Drop every cached endpoint response"""
+    for cache in _caches:
+        cache.clear()
+    logger.debug("🧹 Cleared cached API responses")
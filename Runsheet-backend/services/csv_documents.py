@@ -0,0 +1,227 @@
+"""
+CSV row conversion for uploads and demo sheets
+Turns flat CSV rows into documents matching the index mappings and ID fields
+"""
+
+import csv
+import logging
+import os
+from datetime import datetime
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fallback location for names that aren't in locations.csv (shared; treat as read-only)
+DEFAULT_LOCATION = {
+    "id": "nairobi-station",
+    "name": "Nairobi Station",
+    "type": "station",
+    "coordinates": {"lat": -1.2921, "lon": 36.8219},
+    "address": "Nairobi, Kenya"
+}
+
+@lru_cache(maxsize=1)
+def load_location_map() -> dict:
+    """Read demo-data/locations.csv once per process into a name -> location object map"""
+    locations_path = os.path.join("demo-data", "locations.csv")
+    location_map = {}
+    
+    try:
+        if os.path.exists(locations_path):
+            with open(locations_path, 'r', encoding='utf-8') as file:
+                locations_reader = csv.DictReader(file)
+                for loc_row in locations_reader:
+                    location_map[loc_row['name']] = {
+                        "id": loc_row['location_id'],
+                        "name": loc_row['name'],
+                        "type": loc_row['type'],
+                        "coordinates": {"lat": float(loc_row['lat']), "lon": float(loc_row['lon'])},
+                        "address": loc_row['address']
+                    }
+    except Exception as e:
+        logger.error(f"Error loading locations CSV: {e}")
+    
+    return location_map
+
+def create_location_object(location_name: str, lat: float = None, lon: float = None):
+    """Create a proper location object from the locations CSV (known locations are shared; treat as read-only)"""
+    # Try to find exact match first
+    location = load_location_map().get(location_name)
+    if location is not None:
+        return location
+    
+    # If custom coordinates provided, create dynamic location
+    if lat is not None and lon is not None:
+        return {
+            "id": location_name.lower().replace(" ", "-").replace(",", ""),
+            "name": location_name,
+            "type": "location",
+            "coordinates": {"lat": lat, "lon": lon},
+            "address": f"{location_name}, Kenya"
+        }
+    
+    # Default fallback to Nairobi if no match
+    return DEFAULT_LOCATION
+
+def csv_column(fieldnames, *names):
+    """Return the first of names present in the CSV header, or None"""
+    return next((name for name in names if name in fieldnames), None)
+
+def make_truck_builder(fieldnames) -> Callable[[dict], dict]:
+    """Build a fleet row converter specialized to the columns this CSV actually has"""
+    truck_id_key = csv_column(fieldnames, "truck_id")
+    plate_key = csv_column(fieldnames, "plate_number", "truck_id")
+    driver_key = csv_column(fieldnames, "driver_name", "driver")
+    status_key = csv_column(fieldnames, "status")
+    lat_key = csv_column(fieldnames, "lat")
+    lon_key = csv_column(fieldnames, "lon")
+    current_key = csv_column(fieldnames, "current_location", "location")
+    destination_key = csv_column(fieldnames, "destination")
+    eta_key = csv_column(fieldnames, "estimated_arrival", "eta")
+    cargo_key = csv_column(fieldnames, "cargo_type", "cargo")
+    description_key = csv_column(fieldnames, "cargo_description", "description")
+    # Every row of one file shares the same update time
+    last_update = datetime.now().isoformat() + "Z"
+    
+    def build(row: dict) -> dict:
+        truck_id = row[truck_id_key] if truck_id_key else None
+        
+        # Get coordinates if available
+        lat = row[lat_key] if lat_key else None
+        lon = row[lon_key] if lon_key else None
+        lat = float(lat) if lat else None
+        lon = float(lon) if lon else None
+        
+        current_location_name = row[current_key] if current_key else "Nairobi Station"
+        destination_name = row[destination_key] if destination_key else "Mombasa Port"
+        
+        return {
+            "truck_id": truck_id,
+            "plate_number": row[plate_key] if plate_key else None,
+            "driver_id": f"driver-{truck_id if truck_id_key else 'unknown'}",
+            "driver_name": row[driver_key] if driver_key else None,
+            "status": row[status_key] if status_key else "on_time",
+            "current_location": create_location_object(current_location_name, lat, lon),
+            "destination": create_location_object(destination_name),
+            "route": {
+                "id": f"{current_location_name.lower().replace(' ', '-')}-{destination_name.lower().replace(' ', '-')}",
+                "distance": 500.0,  # Default distance
+                "estimated_duration": 300,  # Default 5 hours
+                "actual_duration": None
+            },
+            "estimated_arrival": row[eta_key] if eta_key else None,
+            "last_update": last_update,
+            "cargo": {
+                "type": row[cargo_key] if cargo_key else "General Cargo",
+                "weight": 10000.0,  # Default weight
+                "volume": 30.0,     # Default volume
+                "description": row[description_key] if description_key else "Standard cargo",
+                "priority": "medium"
+            }
+        }
+    
+    return build
+
+def make_order_builder(fieldnames) -> Callable[[dict], dict]:
+    """Build an orders row converter specialized to the columns this CSV actually has"""
+    order_id_key = csv_column(fieldnames, "order_id")
+    customer_key = csv_column(fieldnames, "customer")
+    status_key = csv_column(fieldnames, "status")
+    value_key = csv_column(fieldnames, "value")
+    items_key = csv_column(fieldnames, "items", "description")
+    region_key = csv_column(fieldnames, "region")
+    priority_key = csv_column(fieldnames, "priority")
+    truck_id_key = csv_column(fieldnames, "truck_id")
+    
+    def build(row: dict) -> dict:
+        value = row[value_key] if value_key else None
+        return {
+            "order_id": row[order_id_key] if order_id_key else None,
+            "customer": row[customer_key] if customer_key else None,
+            "status": row[status_key] if status_key else "pending",
+            "value": float(value) if value else 0,
+            "items": row[items_key] if items_key else None,
+            "region": row[region_key] if region_key else None,
+            "priority": row[priority_key] if priority_key else "medium",
+            "truck_id": row[truck_id_key] if truck_id_key else None
+        }
+    
+    return build
+
+def make_inventory_builder(fieldnames) -> Callable[[dict], dict]:
+    """Build an inventory row converter specialized to the columns this CSV actually has"""
+    item_id_key = csv_column(fieldnames, "item_id")
+    name_key = csv_column(fieldnames, "name", "item_name")
+    category_key = csv_column(fieldnames, "category")
+    quantity_key = csv_column(fieldnames, "quantity")
+    unit_key = csv_column(fieldnames, "unit")
+    location_key = csv_column(fieldnames, "location")
+    status_key = csv_column(fieldnames, "status")
+    
+    def build(row: dict) -> dict:
+        quantity = row[quantity_key] if quantity_key else None
+        return {
+            "item_id": row[item_id_key] if item_id_key else None,
+            "name": row[name_key] if name_key else None,
+            "category": row[category_key] if category_key else None,
+            "quantity": int(quantity) if quantity else 0,
+            "unit": row[unit_key] if unit_key else None,
+            "location": row[location_key] if location_key else None,
+            "status": row[status_key] if status_key else "in_stock"
+        }
+    
+    return build
+
+def make_support_ticket_builder(fieldnames) -> Callable[[dict], dict]:
+    """Build a support row converter specialized to the columns this CSV actually has"""
+    ticket_id_key = csv_column(fieldnames, "ticket_id")
+    customer_key = csv_column(fieldnames, "customer")
+    issue_key = csv_column(fieldnames, "issue")
+    description_key = csv_column(fieldnames, "description")
+    priority_key = csv_column(fieldnames, "priority")
+    status_key = csv_column(fieldnames, "status")
+    
+    def build(row: dict) -> dict:
+        return {
+            "ticket_id": row[ticket_id_key] if ticket_id_key else None,
+            "customer": row[customer_key] if customer_key else None,
+            "issue": row[issue_key] if issue_key else None,
+            "description": row[description_key] if description_key else None,
+            "priority": row[priority_key] if priority_key else "medium",
+            "status": row[status_key] if status_key else "open"
+        }
+    
+    return build
+
+# Row builder factories by upload data type, specialized once per file from its header
+CSV_ROW_BUILDERS = {
+    "trucks": make_truck_builder,
+    "fleet": make_truck_builder,
+    "orders": make_order_builder,
+    "inventory": make_inventory_builder,
+    "support_tickets": make_support_ticket_builder,
+    "support": make_support_ticket_builder
+}
+
+def csv_row_builder(data_type: str, fieldnames) -> Optional[Callable[[dict], dict]]:
+    """Return the row builder for a data type and CSV header, or None for unknown data types"""
+    make_builder = CSV_ROW_BUILDERS.get(data_type)
+    return make_builder(frozenset(fieldnames or ())) if make_builder else None
+
+def iter_csv_documents(rows: Iterable[dict], builder: Optional[Callable[[dict], dict]]) -> Iterator[dict]:
+    """Lazily convert CSV rows to documents, skipping rows that fail to convert"""
+    if builder is None:
+        return
+    
+    for row in rows:
+        try:
+            document = builder(row)
+        except Exception as e:
+            logger.error(f"Error converting CSV row: {e}")
+            continue
+        yield document
+
+def convert_csv_rows_to_documents(rows: Iterable[dict], builder: Optional[Callable[[dict], dict]]) -> list:
+    """Convert every CSV row to a document, skipping rows that fail to convert"""
+    return list(iter_csv_documents(rows, builder))
@@ -10,18 +10,21 @@ from services.elasticsearch_service import elasticsearch_service
 
 logger = logging.getLogger(__name__)
 
+# Indices written by the seeders
+SEED_INDICES = ["trucks", "locations", "orders", "inventory", "support_tickets", "analytics_events"]
+
 class DataSeeder:
     def __init__(self):
         self.es_service = elasticsearch_service
     
     async def clear_all_data(self):
         """Clear all existing data from indices"""
-        indices = ["trucks", "locations", "orders", "inventory", "support_tickets", "analytics_events"]
-        for index in indices:
+        for index in SEED_INDICES:
             try:
                 # Delete all documents in the index
                 query = {"query": {"match_all": {}}}
                 self.es_service.client.delete_by_query(index=index, body=query, refresh=True)
+                self.es_service.invalidate_cache(index)
                 logger.info(f"🗑️ Cleared data from {index}")
             except Exception as e:
                 logger.warning(f"Could not clear {index}: {e}")
@@ -33,20 +36,22 @@ class DataSeeder:
             
             # Check if data already exists (unless forced)
             if not force:
-                existing_trucks = await self.es_service.get_all_documents("trucks")
+                existing_trucks = await self.es_service.get_all_documents("trucks", size=1)
                 if len(existing_trucks) > 0:
                     logger.info("📋 Data already exists, skipping seeding")
                     return
             
-            # Seed locations first (referenced by other entities)
-            await self.seed_locations()
-            
-            # Seed other entities
-            await self.seed_trucks()
-            await self.seed_orders()
-            await self.seed_inventory()
-            await self.seed_support_tickets()
-            await self.seed_analytics_events()
+            # Entities are independent, so their bulk requests run concurrently; seeding writes
+            # skip the per-request refresh and everything becomes searchable when loading ends
+            async with self.es_service.bulk_loading(SEED_INDICES):
+                await asyncio.gather(
+                    self.seed_locations(),
+                    self.seed_trucks(),
+                    self.seed_orders(),
+                    self.seed_inventory(),
+                    self.seed_support_tickets(),
+                    self.seed_analytics_events()
+                )
             
             logger.info("✅ Data seeding completed successfully!")
             
@@ -60,7 +65,7 @@ class DataSeeder:
             logger.info(f"🌅 Seeding baseline data for {operational_time}...")
             
             # Check if baseline data already exists
-            existing_trucks = await self.es_service.get_all_documents("trucks")
+            existing_trucks = await self.es_service.get_all_documents("trucks", size=1)
             if len(existing_trucks) > 0:
                 logger.info("📋 Baseline data already exists, skipping seeding")
                 return
@@ -74,15 +79,16 @@ class DataSeeder:
                 "data_version": "v1"
             }
             
-            # Seed locations first
-            await self.seed_locations(batch_metadata)
-            
-            # Seed baseline operational data
-            await self.seed_baseline_trucks(batch_metadata, base_timestamp)
-            await self.seed_baseline_orders(batch_metadata, base_timestamp)
-            await self.seed_baseline_inventory(batch_metadata, base_timestamp)
-            await self.seed_baseline_support_tickets(batch_metadata, base_timestamp)
-            await self.seed_analytics_events(batch_metadata)
+            # Seed locations and baseline operational data concurrently
+            async with self.es_service.bulk_loading(SEED_INDICES):
+                await asyncio.gather(
+                    self.seed_locations(batch_metadata),
+                    self.seed_baseline_trucks(batch_metadata, base_timestamp),
+                    self.seed_baseline_orders(batch_metadata, base_timestamp),
+                    self.seed_baseline_inventory(batch_metadata, base_timestamp),
+                    self.seed_baseline_support_tickets(batch_metadata, base_timestamp),
+                    self.seed_analytics_events(batch_metadata)
+                )
             
             logger.info("✅ Baseline data seeding completed!")
             
@@ -90,28 +96,29 @@ class DataSeeder:
             logger.error(f"❌ Baseline data seeding failed: {e}")
             raise
     
-    async def upsert_batch_data(self, data_type: str, documents: list, batch_id: str, operational_time: str):
-        """Upsert batch data with temporal metadata"""
+    async def upsert_batch_data(self, data_type: str, documents: list, batch_id: str, operational_time: str, refresh: bool = True):
+        """Upsert batch data with temporal metadata, optionally deferring the refresh to the caller"""
         try:
             logger.info(f"📊 Upserting {len(documents)} {data_type} documents for batch {batch_id}")
             
             # Add temporal metadata to all documents
+            hour, minute = operational_time.split(':')[:2]
             batch_metadata = {
                 "batch_id": batch_id,
                 "operational_time": operational_time,
                 "ingestion_timestamp": datetime.now().isoformat(),
-                "data_version": f"v{len(batch_id.split('_')) + 1}"
+                "data_version": f"v{len(batch_id.split('_')) + 1}",
+                "operational_timestamp": datetime.now().replace(
+                    hour=int(hour),
+                    minute=int(minute),
+                    second=0,
+                    microsecond=0
+                ).isoformat()
             }
             
             # Add metadata to each document
             for doc in documents:
                 doc.update(batch_metadata)
-                doc["operational_timestamp"] = datetime.now().replace(
-                    hour=int(operational_time.split(':')[0]),
-                    minute=int(operational_time.split(':')[1]),
-                    second=0,
-                    microsecond=0
-                ).isoformat()
             
             # Map data types to correct indices
             index_name = data_type
@@ -121,10 +128,10 @@ class DataSeeder:
                 index_name = "support_tickets"  # Support data goes to support_tickets index
             
             # Upsert documents (update existing, insert new)
-            await self.es_service.bulk_index_documents(index_name, documents)
+            await self.es_service.bulk_index_documents(index_name, documents, refresh=refresh)
             
             logger.info(f"✅ Successfully upserted {len(documents)} {data_type} documents")
-            return {"status": "success", "recordCount": len(documents)}
+            return {"status": "success", "recordCount": len(documents), "index": index_name}
             
         except Exception as e:
             logger.error(f"❌ Batch upsert failed: {e}")
@@ -196,7 +203,7 @@ class DataSeeder:
             for location in locations_data:
                 location.update(batch_metadata)
         
-        await self.es_service.bulk_index_documents("locations", locations_data)
+        await self.es_service.bulk_index_documents("locations", locations_data, refresh=False)
         logger.info("✅ Seeded locations data")
     
     async def seed_trucks(self):
@@ -420,7 +427,7 @@ class DataSeeder:
             }
         ]
         
-        await self.es_service.bulk_index_documents("trucks", trucks_data)
+        await self.es_service.bulk_index_documents("trucks", trucks_data, refresh=False)
         logger.info("✅ Seeded trucks data")
     
     async def seed_orders(self):
@@ -480,7 +487,7 @@ class DataSeeder:
             }
         ]
         
-        await self.es_service.bulk_index_documents("orders", orders_data)
+        await self.es_service.bulk_index_documents("orders", orders_data, refresh=False)
         logger.info("✅ Seeded orders data")
     
     async def seed_inventory(self):
@@ -538,7 +545,7 @@ class DataSeeder:
             }
         ]
         
-        await self.es_service.bulk_index_documents("inventory", inventory_data)
+        await self.es_service.bulk_index_documents("inventory", inventory_data, refresh=False)
         logger.info("✅ Seeded inventory data")
     
     async def seed_support_tickets(self):
@@ -591,7 +598,7 @@ class DataSeeder:
             }
         ]
         
-        await self.es_service.bulk_index_documents("support_tickets", tickets_data)
+        await self.es_service.bulk_index_documents("support_tickets", tickets_data, refresh=False)
         logger.info("✅ Seeded support tickets data")
     
     async def seed_analytics_events(self, batch_metadata=None):
@@ -749,7 +756,7 @@ class DataSeeder:
             for event in events_data:
                 event.update(batch_metadata)
         
-        await self.es_service.bulk_index_documents("analytics_events", events_data)
+        await self.es_service.bulk_index_documents("analytics_events", events_data, refresh=False)
         logger.info(f"✅ Seeded {len(events_data)} analytics events with time-series data")
     
     async def seed_baseline_trucks(self, batch_metadata, base_timestamp):
@@ -869,7 +876,7 @@ class DataSeeder:
         for truck in trucks_data:
             truck.update(batch_metadata)
         
-        await self.es_service.bulk_index_documents("trucks", trucks_data)
+        await self.es_service.bulk_index_documents("trucks", trucks_data, refresh=False)
         logger.info("✅ Seeded baseline trucks data")
     
     async def seed_baseline_orders(self, batch_metadata, base_timestamp):
@@ -919,7 +926,7 @@ class DataSeeder:
         for order in orders_data:
             order.update(batch_metadata)
         
-        await self.es_service.bulk_index_documents("orders", orders_data)
+        await self.es_service.bulk_index_documents("orders", orders_data, refresh=False)
         logger.info("✅ Seeded baseline orders data")
     
     async def seed_baseline_inventory(self, batch_metadata, base_timestamp):
@@ -971,7 +978,7 @@ class DataSeeder:
         for item in inventory_data:
             item.update(batch_metadata)
         
-        await self.es_service.bulk_index_documents("inventory", inventory_data)
+        await self.es_service.bulk_index_documents("inventory", inventory_data, refresh=False)
         logger.info("✅ Seeded baseline inventory data")
     
     async def seed_baseline_support_tickets(self, batch_metadata, base_timestamp):
@@ -993,7 +1000,7 @@ class DataSeeder:
         for ticket in tickets_data:
             ticket.update(batch_metadata)
         
-        await self.es_service.bulk_index_documents("support_tickets", tickets_data)
+        await self.es_service.bulk_index_documents("support_tickets", tickets_data, refresh=False)
         logger.info("✅ Seeded baseline support tickets data")
 
 # Global instance
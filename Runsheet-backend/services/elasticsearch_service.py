@@ -4,20 +4,89 @@ Handles all Elasticsearch operations including index management and data operati
 """
 
 import os
+import asyncio
+import contextlib
+import functools
 import logging
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Iterable, Tuple
 from datetime import datetime
+from cachetools import TTLCache
 from elasticsearch import Elasticsearch
+from elasticsearch.serializer import JsonSerializer, NdjsonSerializer
 from dotenv import load_dotenv
+from services.cache import clear_cache
+from services.search_batcher import SearchBatcher
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# Business ID field for each index (also used as the document _id)
+ID_FIELDS = {
+    "trucks": "truck_id",
+    "inventory": "item_id",
+    "support_tickets": "ticket_id",
+    "orders": "order_id",
+    "locations": "location_id",
+    "analytics_events": "event_id"
+}
+
+# Bulk request sizing: ~1KB documents keep 1000-doc chunks well under the byte cap; tunable per deployment
+BULK_CHUNK_SIZE = int(os.getenv("ES_BULK_CHUNK_SIZE", "1000"))
+BULK_MAX_CHUNK_BYTES = int(os.getenv("ES_BULK_MAX_CHUNK_BYTES", str(50 * 1024 * 1024)))
+BULK_REQUEST_TIMEOUT = int(os.getenv("ES_BULK_REQUEST_TIMEOUT", "60"))
+
+# Refresh interval while seeding; segments are made searchable by one explicit refresh at the end
+BULK_LOAD_REFRESH_INTERVAL = "30s"
+
+# Page size for reading whole indices with search_after
+DOCUMENT_PAGE_SIZE = 1000
+
+class ORJSONSerializer(JsonSerializer):
+    """JSON serializer backed by orjson for faster request/response (de)serialization"""
+    
+    def json_dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data, default=self.default)
+    
+    def json_loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+class ORJSONNdjsonSerializer(NdjsonSerializer):
+    """NDJSON serializer (bulk, msearch) backed by orjson"""
+    
+    def json_dumps(self, data: Any) -> bytes:
+        return orjson.dumps(data, default=self.default)
+    
+    def json_loads(self, data: bytes) -> Any:
+        return orjson.loads(data)
+
+def _cached_read(index: str):
+    """Cache an argument-less read method's result alongside full-index reads of the given index"""
+    def decorator(method):
+        @functools.wraps(method)
+        async def wrapper(self):
+            return await self._cached((index, method.__name__), lambda: method(self))
+        return wrapper
+    return decorator
+
 class ElasticsearchService:
     def __init__(self):
         self.client = None
+        # Short-lived cache of full-index reads, shared by the API and agent tools
+        self._docs_cache = TTLCache(maxsize=64, ttl=30)
+        self._docs_locks = {}
+        # Concurrent semantic searches share one _msearch per batch window
+        self.search_batcher = SearchBatcher(
+            self,
+            max_batch=int(os.getenv("SEARCH_BATCH_SIZE", "32")),
+            max_wait=int(os.getenv("SEARCH_BATCH_WAIT_MS", "50")) / 1000
+        )
         self.connect()
     
     def connect(self):
@@ -29,16 +98,30 @@ class ElasticsearchService:
             if not api_key or not endpoint:
                 raise ValueError("ELASTIC_API_KEY and ELASTIC_ENDPOINT must be set in environment")
             
+            # Use orjson for request/response bodies when it is installed
+            client_options = {}
+            if orjson is not None:
+                client_options["serializers"] = {
+                    JsonSerializer.mimetype: ORJSONSerializer(),
+                    NdjsonSerializer.mimetype: ORJSONNdjsonSerializer()
+                }
+            
+            # One client per process; its pool is sized for the concurrent request ceiling
+            # (worker threads running searches, bulk writes and batched _msearch calls)
+            pool_size = int(os.getenv("ELASTIC_MAX_CONNECTIONS", "100"))
             self.client = Elasticsearch(
                 endpoint,
                 api_key=api_key,
                 verify_certs=True,
-                request_timeout=30
+                request_timeout=30,
+                connections_per_node=pool_size,
+                http_compress=True,
+                **client_options
             )
             
             # Test connection
             if self.client.ping():
-                logger.info("✅ Connected to Elasticsearch successfully")
+                logger.info(f"✅ Connected to Elasticsearch successfully (pool of {pool_size} connections)")
                 self.setup_indices()
             else:
                 raise ConnectionError("Failed to ping Elasticsearch")
@@ -47,6 +130,12 @@ class ElasticsearchService:
             logger.error(f"❌ Failed to connect to Elasticsearch: {e}")
             raise
     
+    def close(self):
+        """Close the client and its pooled connections"""
+        if self.client is not None:
+            self.client.close()
+            logger.info("🔌 Closed Elasticsearch connection pool")
+    
     def setup_indices(self):
         """Create indices with proper mappings if they don't exist"""
         indices = {
@@ -258,6 +347,29 @@ class ElasticsearchService:
             }
         }
     
+    def invalidate_cache(self, index: Optional[str] = None):
+        """Drop cached reads for an index, or for every index when none is given"""
+        for key in list(self._docs_cache.keys()):
+            if index is None or key[0] == index:
+                self._docs_cache.pop(key, None)
+        # API responses combine several indices, so any write clears them all
+        clear_cache()
+    
+    async def _cached(self, key: tuple, fetch):
+        """Return a cached value for key, coalescing concurrent misses into one fetch; key[0] is the index"""
+        value = self._docs_cache.get(key)
+        if value is not None:
+            return value
+        
+        lock = self._docs_locks.setdefault(key, asyncio.Lock())
+        async with lock:
+            # Another caller may have filled the cache while we waited
+            value = self._docs_cache.get(key)
+            if value is None:
+                value = await fetch()
+                self._docs_cache[key] = value
+        return value
+    
     # CRUD Operations
     async def index_document(self, index: str, doc_id: str, document: Dict[Any, Any]):
         """Index a single document"""
@@ -272,53 +384,105 @@ class ElasticsearchService:
                 body=document,
                 refresh=True
             )
+            self.invalidate_cache(index)
             return response
         except Exception as e:
             logger.error(f"Failed to index document in {index}: {e}")
             raise
     
-    async def bulk_index_documents(self, index: str, documents: List[Dict[Any, Any]]):
-        """Bulk index multiple documents"""
+    def _bulk_actions(self, index: str, documents: Iterable[Dict[Any, Any]]):
+        """Yield bulk index actions, stamping timestamps and the index's ID field as _id"""
+        id_field = ID_FIELDS.get(index, f"{index[:-1]}_id")
+        for doc in documents:
+            doc["updated_at"] = datetime.now().isoformat()
+            if "created_at" not in doc:
+                doc["created_at"] = datetime.now().isoformat()
+            
+            doc_id = doc.get("id") or doc.get(id_field)
+            if not doc_id:
+                logger.warning(f"No ID found for document in {index} index. Available fields: {list(doc.keys())}")
+            
+            yield {
+                "_index": index,
+                "_id": doc_id,
+                "_source": doc
+            }
+    
+    async def bulk_index_documents(self, index: str, documents: List[Dict[Any, Any]], refresh: bool = True):
+        """Bulk index multiple documents, optionally leaving the refresh to a later refresh_indices call"""
         try:
             from elasticsearch.helpers import bulk
             
-            actions = []
-            for doc in documents:
-                doc["updated_at"] = datetime.now().isoformat()
-                if "created_at" not in doc:
-                    doc["created_at"] = datetime.now().isoformat()
-                
-                # Map index names to correct ID fields
-                id_field_map = {
-                    "trucks": "truck_id",
-                    "inventory": "item_id", 
-                    "support_tickets": "ticket_id",
-                    "orders": "order_id",
-                    "locations": "location_id",
-                    "analytics_events": "event_id"
-                }
-                
-                # Get the correct ID field for this index
-                id_field = id_field_map.get(index, f"{index[:-1]}_id")
-                doc_id = doc.get("id") or doc.get(id_field)
-                
-                if not doc_id:
-                    logger.warning(f"No ID found for document in {index} index. Available fields: {list(doc.keys())}")
-                
-                action = {
-                    "_index": index,
-                    "_id": doc_id,
-                    "_source": doc
-                }
-                actions.append(action)
-            
-            response = bulk(self.client, actions, refresh=True)
+            response = await asyncio.to_thread(
+                bulk,
+                self.client.options(request_timeout=BULK_REQUEST_TIMEOUT),
+                self._bulk_actions(index, documents),
+                chunk_size=BULK_CHUNK_SIZE,
+                max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+                refresh=refresh
+            )
+            self.invalidate_cache(index)
             logger.info(f"✅ Bulk indexed {len(documents)} documents to {index}")
             return response
         except Exception as e:
             logger.error(f"Failed to bulk index documents in {index}: {e}")
             raise
     
+    async def bulk_index_stream(self, index: str, documents: Iterable[Dict[Any, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """Bulk index a lazily produced stream of documents in sized chunks, returning the indexed count and per-document errors"""
+        try:
+            from elasticsearch.helpers import bulk
+            
+            indexed, errors = await asyncio.to_thread(
+                bulk,
+                self.client.options(request_timeout=BULK_REQUEST_TIMEOUT),
+                self._bulk_actions(index, documents),
+                chunk_size=BULK_CHUNK_SIZE,
+                max_chunk_bytes=BULK_MAX_CHUNK_BYTES,
+                raise_on_error=False,
+                refresh=True
+            )
+            self.invalidate_cache(index)
+            if errors:
+                logger.warning(f"⚠️ {len(errors)} documents failed to index in {index}")
+            logger.info(f"✅ Bulk indexed {indexed} documents to {index}")
+            return indexed, errors
+        except Exception as e:
+            logger.error(f"Failed to bulk index documents in {index}: {e}")
+            raise
+    
+    async def _set_refresh_interval(self, indices: List[str], interval: Optional[str]):
+        """Set refresh_interval on indices (None restores the default); some deployments reject this, so failures only warn"""
+        try:
+            await asyncio.to_thread(
+                self.client.indices.put_settings,
+                index=",".join(indices),
+                settings={"index": {"refresh_interval": interval}}
+            )
+        except Exception as e:
+            logger.warning(f"⚠️ Could not set refresh_interval={interval} on {', '.join(indices)}: {e}")
+    
+    @contextlib.asynccontextmanager
+    async def bulk_loading(self, indices: List[str]):
+        """Slow periodic refreshes while loading indices, then restore the default and refresh once"""
+        await self._set_refresh_interval(indices, BULK_LOAD_REFRESH_INTERVAL)
+        try:
+            yield
+        finally:
+            await self._set_refresh_interval(indices, None)
+            await self.refresh_indices(indices)
+    
+    async def refresh_indices(self, indices: List[str]):
+        """Make everything indexed so far searchable in one refresh call"""
+        try:
+            await asyncio.to_thread(self.client.indices.refresh, index=",".join(indices))
+            for index in indices:
+                self.invalidate_cache(index)
+            logger.info(f"🔄 Refreshed indices: {', '.join(indices)}")
+        except Exception as e:
+            logger.error(f"Failed to refresh indices {indices}: {e}")
+            raise
+    
     async def search_documents(self, index: str, query: Dict[Any, Any], size: int = 100):
         """Search documents in an index"""
         try:
@@ -326,7 +490,9 @@ class ElasticsearchService:
             if "size" not in query:
                 query["size"] = size
             
-            response = self.client.search(
+            # Run the blocking client call off the event loop so concurrent searches overlap
+            response = await asyncio.to_thread(
+                self.client.search,
                 index=index,
                 body=query
             )
@@ -338,26 +504,249 @@ class ElasticsearchService:
     async def get_document(self, index: str, doc_id: str):
         """Get a single document by ID"""
         try:
-            response = self.client.get(index=index, id=doc_id)
+            response = await asyncio.to_thread(self.client.get, index=index, id=doc_id)
             return response["_source"]
         except Exception as e:
             logger.error(f"Failed to get document {doc_id} from {index}: {e}")
             raise
     
-    async def get_all_documents(self, index: str, size: int = 1000):
-        """Get all documents from an index"""
+    async def mget_documents(self, index: str, ids: List[str], source_includes: Optional[List[str]] = None):
+        """Get several documents by ID in one request, skipping IDs that don't exist"""
+        try:
+            response = await asyncio.to_thread(
+                self.client.mget, index=index, ids=ids, source_includes=source_includes
+            )
+            return [doc["_source"] for doc in response["docs"] if doc.get("found")]
+        except Exception as e:
+            logger.error(f"Failed to get documents {', '.join(ids)} from {index}: {e}")
+            raise
+    
+    async def get_all_documents(self, index: str, size: Optional[int] = None, source_includes: Optional[List[str]] = None):
+        """Get all documents from an index, or the newest size of them (cached briefly; treat the result as read-only)"""
+        try:
+            async def fetch():
+                # Page with search_after so no single response has to hold the whole index
+                documents = []
+                batch_size = min(size, DOCUMENT_PAGE_SIZE) if size else DOCUMENT_PAGE_SIZE
+                async for batch in self.iter_document_batches(index, batch_size, source_includes):
+                    documents.extend(batch)
+                    if size and len(documents) >= size:
+                        return documents[:size]
+                return documents
+            
+            key = (index, size, tuple(source_includes) if source_includes else None)
+            return await self._cached(key, fetch)
+        except Exception as e:
+            logger.error(f"Failed to get all documents from {index}: {e}")
+            raise
+    
+    @staticmethod
+    def _filter_clauses(filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Build term/terms filter clauses from field values (a list value matches any of its items)"""
+        return [
+            {"terms" if isinstance(value, list) else "term": {field: value}}
+            for field, value in filters.items()
+        ]
+    
+    @staticmethod
+    def _page_query(index: str, source_includes: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Match-all query in stable newest-first order, for search_after paging"""
+        query = {
+            "query": {"match_all": {}},
+            # The ID field breaks ties between documents created at the same instant
+            "sort": [
+                {"created_at": {"order": "desc"}},
+                {ID_FIELDS.get(index, f"{index[:-1]}_id"): {"order": "asc"}}
+            ]
+        }
+        if source_includes:
+            query["_source"] = {"includes": source_includes}
+        return query
+    
+    async def iter_document_batches(self, index: str, batch_size: int = DOCUMENT_PAGE_SIZE,
+                                    source_includes: Optional[List[str]] = None,
+                                    search_after: Optional[list] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Page through every document in an index with search_after, newest first"""
+        try:
+            query = self._page_query(index, source_includes)
+            if search_after:
+                query["search_after"] = search_after
+            
+            while True:
+                response = await self.search_documents(index, query, batch_size)
+                hits = response["hits"]["hits"]
+                if not hits:
+                    return
+                yield [hit["_source"] for hit in hits]
+                if len(hits) < batch_size:
+                    return
+                query["search_after"] = hits[-1]["sort"]
+        except Exception as e:
+            logger.error(f"Failed to iterate documents in {index}: {e}")
+            raise
+    
+    async def query(self, index: str, filters: Dict[str, Any], size: int = 1000, source_includes: Optional[List[str]] = None):
+        """Get documents matching exact field values (a list value matches any of its items)"""
         try:
             query = {
-                "query": {"match_all": {}},
+                "query": {"bool": {"filter": self._filter_clauses(filters)}},
                 "sort": [{"created_at": {"order": "desc"}}]
             }
+            if source_includes:
+                query["_source"] = {"includes": source_includes}
             response = await self.search_documents(index, query, size)
             return [hit["_source"] for hit in response["hits"]["hits"]]
         except Exception as e:
-            logger.error(f"Failed to get all documents from {index}: {e}")
+            logger.error(f"Failed to query {index}: {e}")
             raise
     
-    async def semantic_search(self, index: str, text: str, fields: List[str], size: int = 10):
+    async def top_k(self, index: str, filters: Dict[str, Any], sort_field: str, k: int,
+                    order: str = "asc", source_includes: Optional[List[str]] = None):
+        """Get the first k matching documents by sort_field, plus the total number of matches"""
+        try:
+            query = {
+                "query": {"bool": {"filter": self._filter_clauses(filters)}},
+                "sort": [{sort_field: {"order": order}}],
+                "track_total_hits": True
+            }
+            if source_includes:
+                query["_source"] = {"includes": source_includes}
+            response = await self.search_documents(index, query, k)
+            hits = response["hits"]
+            return [hit["_source"] for hit in hits["hits"]], hits["total"]["value"]
+        except Exception as e:
+            logger.error(f"Failed to get top {k} from {index}: {e}")
+            raise
+    
+    async def get_all_documents_multi(self, source_includes_by_index: Dict[str, Optional[List[str]]]) -> Dict[str, List[Dict[str, Any]]]:
+        """get_all_documents for several indices, fetching the first page of every uncached index in one _msearch"""
+        try:
+            results = {}
+            misses = []
+            for index, source_includes in source_includes_by_index.items():
+                # Same cache entries as get_all_documents, so the list endpoints and this share reads
+                key = (index, None, tuple(source_includes) if source_includes else None)
+                documents = self._docs_cache.get(key)
+                if documents is not None:
+                    results[index] = documents
+                else:
+                    misses.append((index, source_includes, key))
+            
+            if misses:
+                searches = []
+                for index, source_includes, _ in misses:
+                    searches.append({"index": index})
+                    searches.append({**self._page_query(index, source_includes), "size": DOCUMENT_PAGE_SIZE})
+                
+                response = await asyncio.to_thread(self.client.msearch, searches=searches)
+                
+                for (index, source_includes, key), item in zip(misses, response["responses"]):
+                    if "error" in item:
+                        raise Exception(f"{index}: {item['error']}")
+                    hits = item["hits"]["hits"]
+                    documents = [hit["_source"] for hit in hits]
+                    if len(hits) == DOCUMENT_PAGE_SIZE:
+                        # Indices larger than one page continue with their own search_after paging
+                        async for batch in self.iter_document_batches(
+                            index, DOCUMENT_PAGE_SIZE, source_includes, search_after=hits[-1]["sort"]
+                        ):
+                            documents.extend(batch)
+                    self._docs_cache[key] = documents
+                    results[index] = documents
+            
+            return results
+        except Exception as e:
+            logger.error(f"Failed to get all documents from {', '.join(source_includes_by_index)}: {e}")
+            raise
+    
+    async def find_trucks_by_ids(self, identifiers: List[str]):
+        """Get every truck whose ID or plate number matches one of the identifiers (case-insensitive)"""
+        try:
+            should = []
+            for identifier in identifiers:
+                should.append({"term": {"truck_id": {"value": identifier, "case_insensitive": True}}})
+                should.append({"term": {"plate_number": {"value": identifier, "case_insensitive": True}}})
+            query = {
+                "query": {
+                    "bool": {
+                        "filter": [{"bool": {"should": should, "minimum_should_match": 1}}]
+                    }
+                }
+            }
+            response = await self.search_documents("trucks", query, len(identifiers))
+            return [hit["_source"] for hit in response["hits"]["hits"]]
+        except Exception as e:
+            logger.error(f"Failed to find trucks {', '.join(identifiers)}: {e}")
+            raise
+    
+    async def status_counts(self, index: str, field: str = "status") -> Dict[str, int]:
+        """Count documents per value of a keyword field using a terms aggregation"""
+        try:
+            query = {
+                "aggs": {
+                    "by_status": {
+                        "terms": {"field": field, "size": 20}
+                    }
+                }
+            }
+            response = await self.search_documents(index, query, 0)
+            buckets = response["aggregations"]["by_status"]["buckets"]
+            return {bucket["key"]: bucket["doc_count"] for bucket in buckets}
+        except Exception as e:
+            logger.error(f"Failed to get {field} counts from {index}: {e}")
+            raise
+    
+    async def filter_counts(self, filters_by_index: Dict[str, Dict[str, Dict[str, Any]]]) -> Dict[str, Dict[str, int]]:
+        """Count named filters per index with one filters aggregation each, batched in a single _msearch"""
+        try:
+            searches = []
+            for index, filters in filters_by_index.items():
+                searches.append({"index": index})
+                searches.append({
+                    "size": 0,
+                    "aggs": {"counts": {"filters": {"filters": filters}}}
+                })
+            
+            response = await asyncio.to_thread(self.client.msearch, searches=searches)
+            
+            results = {}
+            for index, item in zip(filters_by_index, response["responses"]):
+                if "error" in item:
+                    raise Exception(f"{index}: {item['error']}")
+                buckets = item["aggregations"]["counts"]["buckets"]
+                results[index] = {name: bucket["doc_count"] for name, bucket in buckets.items()}
+            return results
+        except Exception as e:
+            logger.error(f"Failed to get filter counts for {', '.join(filters_by_index)}: {e}")
+            raise
+    
+    async def find_one(self, index: str, filters: Dict[str, Any]):
+        """Get the first document where any of the given keyword fields matches its value (case-insensitive)"""
+        try:
+            query = {
+                "query": {
+                    "bool": {
+                        "filter": [{
+                            "bool": {
+                                "should": [
+                                    {"term": {field: {"value": value, "case_insensitive": True}}}
+                                    for field, value in filters.items()
+                                ],
+                                "minimum_should_match": 1
+                            }
+                        }]
+                    }
+                }
+            }
+            response = await self.search_documents(index, query, 1)
+            hits = response["hits"]["hits"]
+            return hits[0]["_source"] if hits else None
+        except Exception as e:
+            logger.error(f"Failed to find document in {index}: {e}")
+            raise
+    
+    async def semantic_search(self, index: str, text: str, fields: List[str], size: int = 10,
+                              source_includes: Optional[List[str]] = None):
         """Perform semantic search using semantic_text fields"""
         try:
             query = {
@@ -369,7 +758,10 @@ class ElasticsearchService:
                     }
                 }
             }
-            response = await self.search_documents(index, query, size)
+            query["size"] = size
+            if source_includes:
+                query["_source"] = {"includes": source_includes}
+            response = await self.search_batcher.submit(index, query)
             return [hit["_source"] for hit in response["hits"]["hits"]]
         except Exception as e:
             logger.error(f"Failed to perform semantic search in {index}: {e}")
@@ -436,6 +828,7 @@ class ElasticsearchService:
             logger.error(f"Failed to get time series data: {e}")
             raise
     
+    @_cached_read("analytics_events")
     async def get_route_performance_data(self):
         """Get route performance aggregation"""
         try:
@@ -468,6 +861,7 @@ class ElasticsearchService:
             logger.error(f"Failed to get route performance data: {e}")
             raise
     
+    @_cached_read("analytics_events")
     async def get_delay_causes_data(self):
         """Get delay causes aggregation"""
         try:
@@ -500,6 +894,7 @@ class ElasticsearchService:
             logger.error(f"Failed to get delay causes data: {e}")
             raise
     
+    @_cached_read("analytics_events")
     async def get_regional_performance_data(self):
         """Get regional performance aggregation"""
         try:
@@ -532,6 +927,7 @@ class ElasticsearchService:
             logger.error(f"Failed to get regional performance data: {e}")
             raise
     
+    @_cached_read("analytics_events")
     async def get_current_metrics(self):
         """Get current performance metrics"""
         try:
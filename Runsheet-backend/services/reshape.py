@@ -0,0 +1,101 @@
+"""
+Reshaping of Elasticsearch documents into frontend API objects
+Maps snake_case documents to camelCase dicts with pydantic-core, outside the Python interpreter loop
+"""
+
+from typing import Any, List, Optional
+from pydantic import BaseModel, Field, TypeAdapter, model_validator
+
+# Output Models (Elasticsearch snake_case documents -> frontend camelCase)
+class RouteOut(BaseModel):
+    id: Any = ""
+    origin: Any = Field(default_factory=dict)
+    destination: Any = Field(default_factory=dict)
+    waypoints: list = Field(default_factory=list)
+    distance: Any = 0
+    estimatedDuration: Any = Field(0, validation_alias="estimated_duration")
+    actualDuration: Any = Field(None, validation_alias="actual_duration")
+
+class TruckOut(BaseModel):
+    id: Any = Field(None, validation_alias="truck_id")
+    plateNumber: Any = Field(None, validation_alias="plate_number")
+    driverId: Any = Field(None, validation_alias="driver_id")
+    driverName: Any = Field(None, validation_alias="driver_name")
+    currentLocation: Any = Field(default_factory=dict, validation_alias="current_location")
+    destination: Any = Field(default_factory=dict)
+    route: RouteOut = Field(default_factory=RouteOut)
+    status: Any = None
+    estimatedArrival: Any = Field(None, validation_alias="estimated_arrival")
+    lastUpdate: Any = Field(None, validation_alias="last_update")
+    cargo: Any = None
+    
+    @model_validator(mode="before")
+    @classmethod
+    def build_route(cls, truck: Any) -> Any:
+        # Build route with origin and destination for frontend compatibility
+        route = {
+            **(truck.get("route") or {}),
+            "origin": truck.get("current_location", {}),
+            "destination": truck.get("destination", {}),
+            "waypoints": []
+        }
+        return {**truck, "route": route}
+
+class InventoryItemOut(BaseModel):
+    id: Any = Field(None, validation_alias="item_id")
+    name: Any = None
+    category: Any = None
+    quantity: Any = None
+    unit: Any = None
+    location: Any = None
+    status: Any = None
+    lastUpdated: Any = Field(None, validation_alias="last_updated")
+
+class OrderOut(BaseModel):
+    id: Any = Field(None, validation_alias="order_id")
+    customer: Any = None
+    status: Any = None
+    value: Any = None
+    items: Any = None
+    truckId: Any = Field(None, validation_alias="truck_id")
+    region: Any = None
+    createdAt: Any = Field(None, validation_alias="created_at")
+    deliveryEta: Any = Field(None, validation_alias="delivery_eta")
+    priority: Any = None
+
+class SupportTicketOut(BaseModel):
+    id: Any = Field(None, validation_alias="ticket_id")
+    customer: Any = None
+    issue: Any = None
+    description: Any = None
+    priority: Any = None
+    status: Any = None
+    createdAt: Any = Field(None, validation_alias="created_at")
+    assignedTo: Any = Field(None, validation_alias="assigned_to")
+    relatedOrder: Any = Field(None, validation_alias="related_order")
+
+TRUCK_LIST_ADAPTER = TypeAdapter(List[TruckOut])
+INVENTORY_LIST_ADAPTER = TypeAdapter(List[InventoryItemOut])
+ORDER_LIST_ADAPTER = TypeAdapter(List[OrderOut])
+SUPPORT_TICKET_LIST_ADAPTER = TypeAdapter(List[SupportTicketOut])
+
+def reshape(adapter: TypeAdapter, documents: list, include: Optional[set] = None) -> list:
+    """Convert Elasticsearch documents to frontend dicts in a single pydantic-core pass"""
+    return adapter.dump_python(
+        adapter.validate_python(documents),
+        include={"__all__": include} if include else None
+    )
+
+def compact_trucks(trucks: list) -> dict:
+    """Normalize trucks so each distinct route is sent once in a routes map and trucks reference it by id"""
+    # Route origin/destination repeat the truck's own currentLocation/destination, so they are left out
+    formatted_trucks = TRUCK_LIST_ADAPTER.dump_python(
+        TRUCK_LIST_ADAPTER.validate_python(trucks),
+        exclude={"__all__": {"route": {"origin", "destination", "waypoints"}}}
+    )
+    routes = {}
+    for truck in formatted_trucks:
+        route = truck["route"]
+        routes.setdefault(route["id"], route)
+        truck["route"] = route["id"]
+    return {"trucks": formatted_trucks, "routes": routes}
@@ -0,0 +1,80 @@
+"""
+Search batcher for Elasticsearch
+Coalesces concurrent searches into a single _msearch round trip
+"""
+
+import asyncio
+import logging
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+class SearchBatcher:
+    """Queue searches and send them together; waits for more only while a previous batch is in flight"""
+
+    def __init__(self, es_service, max_batch: int = 32, max_wait: float = 0.05):
+        self.es_service = es_service
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = None
+        self._consumer = None
+        self._in_flight = set()
+
+    async def submit(self, index: str, body: Dict[str, Any]) -> Dict[str, Any]:
+        """Queue a search and wait for its entry of the batched _msearch response"""
+        if self._consumer is None or self._consumer.done():
+            # Created lazily so the queue and task belong to the running event loop
+            self._queue = asyncio.Queue()
+            self._consumer = asyncio.create_task(self._consume())
+
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((index, body, future))
+        return await future
+
+    async def _consume(self):
+        """Collect queued searches into batches and dispatch each without blocking the next"""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # Take whatever is already queued; only hold the window open for more while an
+            # earlier batch is still in flight, so a lone search is sent immediately
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            deadline = loop.time() + (self.max_wait if self._in_flight else 0)
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch):
+        """Send one _msearch for the batch and hand each caller its own response"""
+        searches = []
+        for index, body, _ in batch:
+            searches.append({"index": index})
+            searches.append(body)
+
+        try:
+            response = await asyncio.to_thread(self.es_service.client.msearch, searches=searches)
+        except Exception as e:
+            logger.error(f"Batched search of {len(batch)} queries failed: {e}")
+            for _, _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        logger.debug(f"🔎 Sent {len(batch)} searches in one _msearch")
+        for (index, _, future), item in zip(batch, response["responses"]):
+            if future.done():
+                continue
+            if "error" in item:
+                future.set_exception(Exception(f"{index}: {item['error']}"))
+            else:
+                future.set_result(item)
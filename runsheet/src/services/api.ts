@@ -47,6 +47,14 @@ export interface AnalyticsMetrics {
   customer_satisfaction: { title: string; value: string; change: string; trend: 'up' | 'down' };
 }
 
+export interface AnalyticsBundle {
+  metrics: AnalyticsMetrics;
+  routes: any[];
+  delayCauses: any[];
+  regional: any[];
+  timeSeries: any[];
+}
+
 class ApiService {
   private async request<T>(endpoint: string, options?: RequestInit): Promise<ApiResponse<T>> {
     try {
@@ -83,6 +91,13 @@ class ApiService {
     return this.request<Truck>(`/fleet/trucks/${id}`);
   }
 
+  async getTrucksByIds(ids: string[]): Promise<ApiResponse<Truck[]>> {
+    return this.request<Truck[]>('/fleet/trucks/batch', {
+      method: 'POST',
+      body: JSON.stringify({ ids }),
+    });
+  }
+
   async updateTruckStatus(id: string, status: string): Promise<ApiResponse<Truck>> {
     return this.request<Truck>(`/fleet/trucks/${id}/status`, {
       method: 'PATCH',
@@ -169,6 +184,10 @@ class ApiService {
     return this.request<any[]>('/analytics/regional');
   }
 
+  async getAnalyticsBundle(timeRange: string = '7d', metric: string = 'delivery_performance_pct'): Promise<ApiResponse<AnalyticsBundle>> {
+    return this.request<AnalyticsBundle>(`/analytics/bundle?timeRange=${timeRange}&metric=${metric}`);
+  }
+
   // Data Upload - Legacy methods (keeping for compatibility)
   async uploadFromSheets(url: string, dataType: string): Promise<ApiResponse<{ recordCount: number }>> {
     return this.request<{ recordCount: number }>('/data/upload/sheets', {